@@ -1,7 +1,8 @@
 from datetime import datetime, timezone
-import random
 import re
+from typing import List, Optional
 
+from .inference_service import RegionRiskScore
 from .schemas import Insight, Metric, RiskRequest, RiskResponse
 
 ZIP_REGEX = re.compile(r"^\d{5}(-\d{4})?$")
@@ -13,76 +14,90 @@ def validate_location(payload: RiskRequest) -> bool:
     return len(payload.query.strip()) > 1
 
 
-def build_mock_response(payload: RiskRequest) -> RiskResponse:
-    seed = sum(ord(ch) for ch in payload.query.lower())
-    random.seed(seed)
-    risk_score = random.randint(12, 88)
-
+def risk_level(risk_score: int) -> tuple[str, str]:
     if risk_score <= 33:
-        level, color = "Low Risk", "green"
-    elif risk_score <= 66:
-        level, color = "Medium Risk", "yellow"
-    else:
-        level, color = "High Risk", "red"
+        return "Low Risk", "green"
+    if risk_score <= 66:
+        return "Medium Risk", "yellow"
+    return "High Risk", "red"
+
+
+def _metric(name: str, score: Optional[int], icon: str, description: str) -> List[Metric]:
+    if score is None:
+        return []
+    return [Metric(name=name, score=score, icon=icon, description=description)]
+
+
+def _build_insights(score: RegionRiskScore) -> List[Insight]:
+    insights: List[Insight] = []
+
+    if score.volatility_score is not None:
+        if score.volatility_score >= 67:
+            insights.append(
+                Insight(text="Rent growth swings more than in most tracked markets.", icon="trending-up")
+            )
+        elif score.volatility_score <= 33:
+            insights.append(
+                Insight(text="Rent growth has been steadier than in most tracked markets.", icon="shield-check")
+            )
+
+    if score.beta_score is not None and score.beta_score >= 67:
+        insights.append(Insight(text="Rents move strongly with the national cycle.", icon="briefcase"))
+
+    if score.seasonality_score is not None and score.seasonality_score >= 67:
+        insights.append(
+            Insight(text="Pronounced seasonal rent swings; time lease renewals carefully.", icon="sparkles")
+        )
+
+    if score.valuation_score is not None:
+        if score.mispricing_z > 1:
+            insights.append(Insight(text="Home prices look stretched relative to local rents.", icon="info"))
+        elif score.mispricing_z < -1:
+            insights.append(Insight(text="Home prices look cheap relative to local rents.", icon="rocket"))
+
+    if not insights:
+        insights.append(Insight(text="Risk indicators sit close to the middle of tracked markets.", icon="info"))
+    return insights
+
+
+def build_risk_response(payload: RiskRequest, score: RegionRiskScore) -> RiskResponse:
+    level, color = risk_level(score.risk_score)
 
     metrics = [
-        Metric(
-            name="Market Volatility",
-            score=random.randint(20, 90),
-            icon="trending-up",
-            description="Stability of pricing and recent sales trends.",
-        ),
-        Metric(
-            name="Neighborhood Safety",
-            score=random.randint(25, 95),
-            icon="shield",
-            description="Crime trends and public safety indicators.",
+        *_metric(
+            "Market Volatility",
+            score.volatility_score,
+            "trending-up",
+            "Variability of monthly rent growth compared with other markets.",
         ),
-        Metric(
-            name="Economic Outlook",
-            score=random.randint(30, 85),
-            icon="briefcase",
-            description="Employment growth and economic resilience.",
+        *_metric(
+            "Market Sensitivity",
+            score.beta_score,
+            "briefcase",
+            "How strongly local rents move with the national average (CAPM beta).",
         ),
-        Metric(
-            name="Liquidity",
-            score=random.randint(15, 80),
-            icon="droplet",
-            description="Expected time on market for similar properties.",
+        *_metric(
+            "Seasonality",
+            score.seasonality_score,
+            "map",
+            "Size of the recurring within-year rent cycle relative to price level.",
         ),
-        Metric(
-            name="Infrastructure",
-            score=random.randint(35, 90),
-            icon="map",
-            description="Access to transit, schools, and amenities.",
+        *_metric(
+            "Valuation",
+            score.valuation_score,
+            "droplet",
+            "Home prices relative to what local rents support across markets.",
         ),
     ]
 
-    insights = [
-        Insight(
-            text="Balanced demand suggests moderate pricing pressure.",
-            icon="sparkles",
-        ),
-        Insight(
-            text="Safety indicators outperform metro averages.",
-            icon="shield-check",
-        ),
-        Insight(
-            text="Infrastructure upgrades planned within 12-18 months.",
-            icon="rocket",
-        ),
-    ]
-
-    location_label = (
-        f"ZIP {payload.query}" if payload.location_type == "zip" else payload.query.title()
-    )
+    location_label = f"ZIP {payload.query}" if payload.location_type == "zip" else score.region
 
     return RiskResponse(
         location=location_label,
-        risk_score=risk_score,
+        risk_score=score.risk_score,
         risk_level=level,
         color=color,
         metrics=metrics,
-        insights=insights,
+        insights=_build_insights(score),
         generated_at=datetime.now(timezone.utc).isoformat(),
     )
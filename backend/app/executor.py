@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import contextvars
+import functools
+import os
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class ComputeQueueFull(RuntimeError):
+    pass
+
+
+class ComputeTimeout(RuntimeError):
+    pass
+
+
+class ComputeExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 64,
+        timeout: float = 30.0,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"executor kind must be one of {EXECUTOR_KINDS}, got {kind!r}")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.initializer = initializer
+
+        self._pool: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Counters are only touched from the event loop thread, so they need no lock.
+        self._queued = 0
+        self._running = 0
+        self._started = 0
+        self._finished = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable[[], None]] = None) -> "ComputeExecutor":
+        def _int_env(name: str) -> Optional[int]:
+            value = os.environ.get(name)
+            return int(value) if value else None
+
+        kind = os.environ.get("INFERENCE_EXECUTOR", "thread")
+        return cls(
+            kind=kind,
+            max_workers=_int_env("INFERENCE_EXECUTOR_WORKERS"),
+            max_concurrency=_int_env("INFERENCE_MAX_CONCURRENCY"),
+            max_queue=_int_env("INFERENCE_MAX_QUEUE") or 64,
+            timeout=float(os.environ.get("INFERENCE_COMPUTE_TIMEOUT", "30")),
+            initializer=initializer if kind == "process" else None,
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._queued >= self.max_queue:
+            self._rejected += 1
+            raise ComputeQueueFull("Too many computations queued")
+
+        started = time.perf_counter()
+        self._queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError as exc:
+            self._timeouts += 1
+            raise ComputeTimeout("Timed out waiting for a compute slot") from exc
+        finally:
+            self._queued -= 1
+
+        waited = time.perf_counter() - started
+        self._started += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+        if self.kind == "thread":
+            # Carry request-scoped context variables into the worker thread.
+            call = functools.partial(contextvars.copy_context().run, func, *args)
+        else:
+            call = functools.partial(func, *args)
+
+        self._running += 1
+        run_started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self._get_pool(), call)
+        # A worker cannot be interrupted, so the slot is only freed once the work really ends.
+        future.add_done_callback(lambda _: self._finish(run_started))
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=max(self.timeout - waited, 0.0))
+        except asyncio.TimeoutError as exc:
+            self._timeouts += 1
+            raise ComputeTimeout("Computation timed out") from exc
+        except Exception:
+            self._failed += 1
+            raise
+
+        self._completed += 1
+        return result
+
+    def _finish(self, run_started: float) -> None:
+        self._running -= 1
+        self._finished += 1
+        self._run_seconds_total += time.perf_counter() - run_started
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "queued": self._queued,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "avg_wait_seconds": self._wait_seconds_total / self._started if self._started else 0.0,
+            "max_wait_seconds": self._wait_seconds_max,
+            "avg_run_seconds": self._run_seconds_total / self._finished if self._finished else 0.0,
+        }
+
+    def restart_workers(self) -> None:
+        # New work goes to a fresh pool; the old one drains its in-flight calls in the background.
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
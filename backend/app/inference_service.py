@@ -1,36 +1,710 @@
 from __future__ import annotations
 
-from functools import lru_cache
+from dataclasses import dataclass
+import logging
+import os
 from pathlib import Path
 import sys
-from typing import List
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 
 _INFERENCE_DIR = Path(__file__).resolve().parents[1] / "inference-engine"
 if str(_INFERENCE_DIR) not in sys.path:
     sys.path.append(str(_INFERENCE_DIR))
 
-from datasets import load_default_datasets
-from risk_analysis import RiskAnalysis
+import numpy as np
+import pandas as pd
 
+from city_lookup import CityNameIndex
+from clustering import DEFAULT_N_CLUSTERS
+from datasets import (
+    REGION_DATASET_FILES,
+    VALUE_DATASET_FILES,
+    files_fingerprint,
+    load_county_rent_timeseries,
+    load_default_datasets,
+    load_region_rent_timeseries,
+)
+from locations import LocationIndex
+from market_arbitrage import MarketArbitrage
+from models import LocationSummary, PortfolioConstraints, RegionRiskScore
+from phases import current_rss_bytes, phase, set_phase_listener
+from risk_analysis import MONTH_ABBREVIATIONS, RiskAnalysis
+from risk_scoring import RiskScoreTable, build_region_features
+from shared_arrays import SharedArrayStore
 
-@lru_cache(maxsize=1)
-def _get_rent_analysis() -> RiskAnalysis:
+
+logger = logging.getLogger(__name__)
+
+PREWARM_MODES = ("background", "blocking", "off")
+
+
+class DatasetUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class _Engine:
+    rent_analysis: RiskAnalysis
+    price_analysis: Optional[RiskAnalysis]
+    arbitrage: Optional[MarketArbitrage]
+    risk_scores: RiskScoreTable
+    locations: LocationIndex
+    locations_fingerprint: str
+    fingerprint: str
+
+
+class _EngineState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.engine: Optional[_Engine] = None
+        self.loading = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.fingerprint: Optional[str] = None
+        self.prewarm_mode = "off"
+        self.checked_at = 0.0
+        self.unreachable_version: Optional[str] = None
+        # Published version, its city labels and their name index, for processes without an engine.
+        self.shared_labels: Optional[tuple[str, frozenset[str], CityNameIndex]] = None
+        self.labels_checked_at = 0.0
+
+
+_state = _EngineState()
+
+
+def _shared_store() -> Optional[SharedArrayStore]:
+    if os.environ.get("INFERENCE_SHARED_ARRAYS", "1").lower() in ("0", "false", "no"):
+        return None
+    return SharedArrayStore(os.environ.get("INFERENCE_SHARED_ARRAYS_DIR") or None)
+
+
+def _share_analysis(kind: str, fingerprint: str, build: Callable[[], RiskAnalysis]) -> RiskAnalysis:
+    store = _shared_store()
+    if store is None:
+        return build()
+
+    built: List[RiskAnalysis] = []
+
+    def export() -> tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        built.append(build())
+        return built[0].export_arrays()
+
+    # Only the first worker for a dataset version builds; the rest map its arrays read-only.
+    try:
+        with phase("engine.shared_arrays"):
+            arrays, meta = store.get_or_publish(f"{kind}-{fingerprint}", export)
+    except OSError:
+        logger.warning("Shared arrays unavailable in %s; keeping a private copy", store.directory, exc_info=True)
+        return built[0] if built else build()
+    return RiskAnalysis.from_arrays(arrays, meta)
+
+
+def _publish_version(fingerprint: str) -> None:
+    store = _shared_store()
+    if store is None:
+        return
+    try:
+        store.set_current(fingerprint)
+    except OSError:
+        logger.warning("Could not record the current dataset version in %s", store.directory, exc_info=True)
+    # Workers still mapping an older version keep their mappings until they switch over.
+    store.prune({f"rent-{fingerprint}", f"price-{fingerprint}"})
+
+
+def _version_check_interval() -> float:
+    return float(os.environ.get("INFERENCE_VERSION_CHECK_MS", "1000")) / 1000
+
+
+def _build_engine() -> tuple[_Engine, str, Dict[str, float]]:
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    with phase("engine.dataset_load"):
+        datasets = load_default_datasets()
+    loaded = time.perf_counter()
+    timings["dataset_load_seconds"] = loaded - started
+
+    rent_analysis = _share_analysis(
+        "rent", datasets.fingerprint, lambda: _new_analysis(datasets.rent_ts, datasets.us_avg_rent)
+    )
+    price_analysis = None
+    if datasets.value_ts is not None:
+        price_analysis = _share_analysis(
+            "price", datasets.fingerprint, lambda: _new_analysis(datasets.value_ts, datasets.us_avg_value)
+        )
+    else:
+        logger.warning(
+            "Home value datasets (%s) not found; serving rent-only analytics without valuation scores",
+            ", ".join(VALUE_DATASET_FILES),
+        )
+    timings["risk_analysis_seconds"] = time.perf_counter() - loaded
+    # Versions left behind by earlier runs are dropped once this one is mapped.
+    _publish_version(datasets.fingerprint)
+
+    engine = _assemble_engine(rent_analysis, price_analysis, datasets.us_avg_rent, datasets.fingerprint, timings)
+    timings["total_seconds"] = time.perf_counter() - started
+    return engine, datasets.fingerprint, timings
+
+
+def _assemble_engine(
+    rent_analysis: RiskAnalysis,
+    price_analysis: Optional[RiskAnalysis],
+    us_avg_rent: pd.Series,
+    fingerprint: str,
+    timings: Dict[str, float],
+    previous: Optional[_Engine] = None,
+) -> _Engine:
+    started = time.perf_counter()
+    rent_analysis.prepare_serving_indexes()
+    indexed = time.perf_counter()
+    timings["serving_indexes_seconds"] = indexed - started
+
+    with phase("engine.risk_scores"):
+        # Without home values the mispricing component is left out of every score.
+        arbitrage = MarketArbitrage(rent_analysis, price_analysis) if price_analysis is not None else None
+        risk_scores = RiskScoreTable(build_region_features(rent_analysis, arbitrage))
+    scored = time.perf_counter()
+    timings["risk_scores_seconds"] = scored - indexed
+
+    locations_fingerprint = files_fingerprint(REGION_DATASET_FILES)
+    if previous is not None and previous.locations_fingerprint == locations_fingerprint:
+        locations = previous.locations
+    else:
+        with phase("engine.location_index"):
+            locations = LocationIndex(
+                sources=[load_region_rent_timeseries(), load_county_rent_timeseries()],
+                us_avg=us_avg_rent,
+            )
+    timings["location_index_seconds"] = time.perf_counter() - scored
+
+    return _Engine(
+        rent_analysis=rent_analysis,
+        price_analysis=price_analysis,
+        arbitrage=arbitrage,
+        risk_scores=risk_scores,
+        locations=locations,
+        locations_fingerprint=locations_fingerprint,
+        fingerprint=fingerprint,
+    )
+
+
+def _is_append(current: pd.DataFrame | pd.Series, latest: pd.DataFrame | pd.Series) -> bool:
+    overlap = len(current)
+    if len(latest) < overlap or not latest.index[:overlap].equals(current.index):
+        return False
+    if isinstance(current, pd.DataFrame) and list(latest.columns) != list(current.columns):
+        return False
+    # Revised history invalidates the running sums, so only pure appends take the fast path.
+    return bool(
+        np.allclose(
+            latest.iloc[:overlap].to_numpy(dtype=np.float64),
+            current.to_numpy(dtype=np.float64),
+            equal_nan=True,
+        )
+    )
+
+
+def _new_analysis(data: pd.DataFrame, us_avg: pd.Series) -> RiskAnalysis:
+    return RiskAnalysis(df=data, asset_names_or_number=list(data.columns), us_avg=us_avg, risk_free_rate=0.0)
+
+
+def _refresh_analysis(current: RiskAnalysis, data: pd.DataFrame, us_avg: pd.Series) -> tuple[RiskAnalysis, str]:
+    if _is_append(current.data, data) and _is_append(current.us_avg_data, us_avg):
+        return current.append_observations(data.iloc[len(current.data) :], us_avg), "incremental"
+
+    analysis = RiskAnalysis(
+        df=data,
+        asset_names_or_number=list(data.columns),
+        us_avg=us_avg,
+        risk_free_rate=current.risk_free_rate,
+        capm_method=current.capm_method,
+        matrix_dtype=current.matrix_dtype.name,
+        block_size=current.block_size,
+    )
+    return analysis, "full"
+
+
+def refresh_engine() -> Dict[str, Any]:
+    if not _state.refresh_lock.acquire(blocking=False):
+        raise RuntimeError("A dataset refresh is already running")
+
+    try:
+        return _refresh_locked()
+    finally:
+        _state.refresh_lock.release()
+
+
+def _refresh_locked() -> Dict[str, Any]:
+    current = _ensure_engine()
+    started = time.perf_counter()
     datasets = load_default_datasets()
-    return RiskAnalysis(
-        df=datasets.rent_ts,
-        asset_names_or_number=list(datasets.rent_ts.columns),
-        us_avg=datasets.us_avg_rent,
-        risk_free_rate=0.0,
+    if datasets.fingerprint == _state.fingerprint:
+        return {"mode": "unchanged", "dataset_fingerprint": datasets.fingerprint, "appended_months": 0}
+
+    timings: Dict[str, float] = {"dataset_load_seconds": time.perf_counter() - started}
+    analyses_started = time.perf_counter()
+    modes: List[str] = []
+
+    def refreshed(analysis: Optional[RiskAnalysis], data: pd.DataFrame, us_avg: pd.Series) -> Callable[[], RiskAnalysis]:
+        # Only called when no other worker has published this version yet.
+        def build() -> RiskAnalysis:
+            if analysis is None:
+                built, mode = _new_analysis(data, us_avg), "full"
+            else:
+                built, mode = _refresh_analysis(analysis, data, us_avg)
+            modes.append(mode)
+            return built
+
+        return build
+
+    rent_analysis = _share_analysis(
+        "rent", datasets.fingerprint, refreshed(current.rent_analysis, datasets.rent_ts, datasets.us_avg_rent)
     )
+    price_analysis = None
+    if datasets.value_ts is not None:
+        price_analysis = _share_analysis(
+            "price", datasets.fingerprint, refreshed(current.price_analysis, datasets.value_ts, datasets.us_avg_value)
+        )
+    timings["risk_analysis_seconds"] = time.perf_counter() - analyses_started
+
+    engine = _assemble_engine(
+        rent_analysis, price_analysis, datasets.us_avg_rent, datasets.fingerprint, timings, previous=current
+    )
+    timings["total_seconds"] = time.perf_counter() - started
+
+    # Requests already holding the old engine finish on it; new ones see the swap.
+    with _state.lock:
+        _state.engine = engine
+        _state.fingerprint = datasets.fingerprint
+        _state.timings = timings
+        _state.error = None
+
+    _publish_version(datasets.fingerprint)
+
+    if not modes:
+        mode = "attached"
+    else:
+        mode = "incremental" if all(built == "incremental" for built in modes) else "full"
+    logger.info("Inference engine refreshed (%s) in %.2fs", mode, timings["total_seconds"])
+    return {
+        "mode": mode,
+        "dataset_fingerprint": datasets.fingerprint,
+        "appended_months": max(len(rent_analysis.data) - len(current.rent_analysis.data), 0),
+        "timings": timings,
+    }
+
+
+def _ensure_engine() -> _Engine:
+    engine = _state.engine
+    if engine is not None:
+        return engine
+
+    # Concurrent first requests wait on the single in-flight build instead of repeating it.
+    with _state.lock:
+        if _state.engine is None:
+            _state.loading = True
+            try:
+                _state.engine, _state.fingerprint, _state.timings = _build_engine()
+                _state.error = None
+            except Exception as exc:
+                _state.error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                _state.loading = False
+        return _state.engine
+
+
+def _follow_published_version(engine: _Engine) -> _Engine:
+    store = _shared_store()
+    now = time.monotonic()
+    if store is None or now - _state.checked_at < _version_check_interval():
+        return engine
+    _state.checked_at = now
+
+    version = store.current()
+    if version is None or version in (engine.fingerprint, _state.unreachable_version):
+        return engine
+    # Another worker refreshed the datasets: switch to its version before answering, so every worker
+    # serves (and tags cached responses with) the same data.
+    with _state.refresh_lock:
+        if _state.engine is None or _state.engine.fingerprint != version:
+            _refresh_locked()
+    if _state.engine.fingerprint != version:
+        # The files this worker sees do not produce that version; do not reload them on every check.
+        logger.warning("Shared dataset version %s does not match the local files; keeping %s", version, _state.fingerprint)
+        _state.unreachable_version = version
+    return _state.engine
+
+
+def _get_engine() -> _Engine:
+    return _follow_published_version(_ensure_engine())
+
+
+def _get_rent_analysis() -> RiskAnalysis:
+    return _get_engine().rent_analysis
+
+
+def warm_up() -> None:
+    _get_engine()
 
 
-def get_top_cities_with_better_return_at_risk(city_name: str, top_n: int = 3) -> List[tuple[str, float, float]]:
+def _warm_up_in_background() -> None:
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Inference engine warm-up failed")
+
+
+def start_prewarm(mode: Optional[str] = None) -> None:
+    mode = mode or os.environ.get("INFERENCE_PREWARM", "background")
+    if mode not in PREWARM_MODES:
+        raise ValueError(f"INFERENCE_PREWARM must be one of {PREWARM_MODES}, got {mode!r}")
+
+    _state.prewarm_mode = mode
+    if mode == "blocking":
+        warm_up()
+    elif mode == "background":
+        _state.loading = True
+        threading.Thread(target=_warm_up_in_background, name="inference-prewarm", daemon=True).start()
+
+
+def _cache_identity(engine: _Engine, city_name: Optional[str]) -> tuple[str, Optional[str]]:
+    resolved = engine.rent_analysis.resolve_asset_name(city_name) if city_name is not None else None
+    return engine.fingerprint, resolved
+
+
+def _published_labels() -> Optional[tuple[str, frozenset[str], CityNameIndex]]:
+    store = _shared_store()
+    if store is None:
+        return None
+    now = time.monotonic()
+    if _state.shared_labels is not None and now - _state.labels_checked_at < _version_check_interval():
+        return _state.shared_labels
+    _state.labels_checked_at = now
+
+    version = store.current()
+    if version is None:
+        return None
+    if _state.shared_labels is None or _state.shared_labels[0] != version:
+        meta = store.read_meta(f"rent-{version}")
+        if meta is None:
+            return None
+        labels = meta["columns"]
+        _state.shared_labels = (version, frozenset(labels), CityNameIndex(labels))
+    return _state.shared_labels
+
+
+def peek_cache_identity(city_name: Optional[str] = None) -> Optional[tuple[str, Optional[str]]]:
+    # Safe on the event loop: it reads the loaded engine or the shared store and never starts a build.
+    engine = _state.engine
+    if engine is not None:
+        return _cache_identity(engine, city_name)
+
+    # Without an engine (process executor), the published version's labels resolve the name here.
+    published = _published_labels()
+    if published is None:
+        return None
+    version, labels, index = published
+    if city_name is None or city_name in labels:
+        return version, city_name
+    return version, index.resolve(city_name)
+
+
+def get_cache_identity(city_name: Optional[str] = None) -> tuple[str, Optional[str]]:
+    return _cache_identity(_get_engine(), city_name)
+
+
+def get_engine_status() -> Dict[str, Any]:
+    store = _shared_store()
+    return {
+        "ready": _state.engine is not None,
+        "valuation": _state.engine is not None and _state.engine.arbitrage is not None,
+        "dataset_fingerprint": _state.fingerprint,
+        "loading": _state.loading,
+        "refreshing": _state.refresh_lock.locked(),
+        "error": _state.error,
+        "prewarm": _state.prewarm_mode,
+        "shared_arrays": str(store.directory) if store is not None else None,
+        "timings": dict(_state.timings),
+    }
+
+
+def _comparable_scores(
+    comparables: List[tuple[str, float, float]],
+) -> List[tuple[str, Optional[float], Optional[float]]]:
+    # A flat or too-short series has no volatility or expected return, so its scores are NaN.
+    return [(name, _finite(risk_score), _finite(return_score)) for name, risk_score, return_score in comparables]
+
+
+def get_top_cities_with_better_return_at_risk(
+    city_name: str, top_n: int = 3
+) -> List[tuple[str, Optional[float], Optional[float]]]:
     analysis = _get_rent_analysis()
-    return analysis.top_cities_with_better_return_at_risk(city_name, top_n=top_n)
+    return _comparable_scores(analysis.top_cities_with_better_return_at_risk(city_name, top_n=top_n))
 
 
 def get_mean_monthly_prices(city_name: str) -> List[tuple[str, int]]:
     analysis = _get_rent_analysis()
-    series = analysis.get_mean_monthly_prices(city_name)
-    return [(month, int(value)) for month, value in series.items()]
+    return analysis.monthly_price_profiles([city_name])[city_name]
+
+
+def suggest_cities(query: str, limit: int = 10) -> List[str]:
+    return _get_rent_analysis().suggest_asset_names(query, limit=limit)
+
+
+def get_cluster_peers(city_name: str, n_clusters: int = DEFAULT_N_CLUSTERS, limit: int = 10) -> Dict[str, Any]:
+    city, cluster, size, peers = _get_rent_analysis().same_cluster_peers(city_name, n_clusters=n_clusters, limit=limit)
+    return {
+        "city": city,
+        "cluster": cluster,
+        "cluster_size": size,
+        "peers": [{"city": name, "correlation": correlation} for name, correlation in peers],
+    }
+
+
+def get_correlated_peers(city_name: str, k: int = 10) -> Dict[str, Any]:
+    city, most, least = _get_rent_analysis().correlated_peers(city_name, k=k)
+    return {
+        "city": city,
+        "most_correlated": [{"city": name, "correlation": correlation} for name, correlation in most],
+        "least_correlated": [{"city": name, "correlation": correlation} for name, correlation in least],
+    }
+
+
+def _unique(names: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(name.strip() for name in names))
+
+
+def get_top_cities_with_better_return_at_risk_batch(
+    city_names: Sequence[str],
+    top_n: int = 3,
+) -> tuple[Dict[str, List[tuple[str, Optional[float], Optional[float]]]], List[str]]:
+    analysis = _get_rent_analysis()
+    known, missing = analysis.split_known_assets(_unique(city_names))
+    results = analysis.top_cities_with_better_return_at_risk_batch(known, top_n=top_n) if known else {}
+    return {city: _comparable_scores(comparables) for city, comparables in results.items()}, missing
+
+
+def get_mean_monthly_prices_batch(city_names: Sequence[str]) -> tuple[Dict[str, List[tuple[str, int]]], List[str]]:
+    analysis = _get_rent_analysis()
+    known, missing = analysis.split_known_assets(_unique(city_names))
+    return analysis.monthly_price_profiles(known), missing
+
+
+def optimize_portfolio_scenarios(
+    city_names: Sequence[str],
+    scenarios: Sequence[Dict[str, Any]],
+) -> tuple[List[str], List[str], List[Dict[str, Any]]]:
+    analysis = _get_rent_analysis()
+    known, missing = analysis.split_known_assets(_unique(city_names))
+    if not known:
+        raise ValueError("None of the requested cities have rent data")
+
+    constraints = [
+        PortfolioConstraints(
+            max_weight=scenario["max_weight"],
+            target_return=scenario.get("target_return"),
+            target_volatility=scenario.get("target_volatility"),
+        )
+        for scenario in scenarios
+    ]
+    cities, solutions = analysis.optimize_portfolios(known, constraints)
+    results = [
+        {
+            "name": scenario.get("name"),
+            "success": solution.success,
+            "message": solution.message,
+            "expected_return": _finite(solution.expected_return),
+            "volatility": _finite(solution.volatility),
+            "weights": [
+                {"city": city, "weight": float(weight)}
+                for city, weight in zip(cities, solution.weights)
+                if solution.success and weight > 1e-6
+            ],
+        }
+        for scenario, solution in zip(scenarios, solutions)
+    ]
+    return cities, missing, results
+
+
+def get_region_risk_score(query: str, location_type: str) -> RegionRiskScore:
+    engine = _get_engine()
+    if location_type == "zip":
+        record_id = engine.locations.resolve(query, levels=("zip",))
+        if record_id is None:
+            raise LookupError(f"No rent data for ZIP {query}")
+    else:
+        score = engine.risk_scores.lookup(engine.rent_analysis.resolve_asset_name(query) or query)
+        if score is not None:
+            return score
+        record_id = engine.locations.resolve(query, levels=("county", "metro"))
+
+    summary = engine.locations.summary(record_id) if record_id is not None else None
+    if summary is None or summary.risk is None:
+        raise LookupError(f"No rent data for {query}")
+    return summary.risk
+
+
+def get_location_summary(query: str, code_type: Optional[str] = None) -> LocationSummary:
+    locations = _get_engine().locations
+    record_id = locations.resolve(query, code_type=code_type)
+    if record_id is None:
+        raise LookupError(f"Location not found: {query}")
+    return locations.summary(record_id)
+
+
+def _finite(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def _get_arbitrage() -> MarketArbitrage:
+    arbitrage = _get_engine().arbitrage
+    if arbitrage is None:
+        raise DatasetUnavailable(f"Home value data is not loaded ({', '.join(VALUE_DATASET_FILES)} missing)")
+    return arbitrage
+
+
+def get_valuation_opportunities(
+    date: Optional[str] = None,
+    limit: int = 10,
+    min_correlation: Optional[float] = None,
+) -> tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    arbitrage = _get_arbitrage()
+    position = arbitrage.valuation_date_position(date)
+    ranked = arbitrage.opportunities_at(date_index=position, correlation_threshold=min_correlation)
+    ranked = ranked[ranked["Z_Score"].notna()]
+
+    def records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        return [
+            {
+                "city": city,
+                "z_score": float(row.Z_Score),
+                "price": float(row.Price),
+                "rent": float(row.Rent),
+                "predicted_price": float(row.Predicted_Price),
+                "correlation": _finite(row.Correlation),
+            }
+            for city, row in zip(frame.index, frame.itertuples(index=False))
+        ]
+
+    panel = arbitrage.compute_valuation_panel()
+    return panel.dates[position], records(ranked.head(limit)), records(ranked.iloc[::-1].head(limit))
+
+
+def get_valuation_history(city_name: str) -> tuple[str, List[tuple[str, float]]]:
+    history = _get_arbitrage().mispricing_history(city_name).dropna()
+    return str(history.name), [(date, float(z_score)) for date, z_score in history.items()]
+
+
+def get_band_breaches(
+    window: Optional[int] = 24,
+    n_std: float = 2.0,
+    date: Optional[str] = None,
+    direction: Optional[str] = None,
+    limit: int = 50,
+) -> tuple[str, List[Dict[str, Any]]]:
+    arbitrage = _get_arbitrage()
+    position = arbitrage.valuation_date_position(date)
+    breaches = arbitrage.band_breaches(window=window, n_std=n_std, date_index=position)
+    if direction is not None:
+        breaches = breaches[breaches["Direction"] == direction]
+
+    records = [
+        {
+            "city": city,
+            "ratio": float(row.Ratio),
+            "mean": float(row.Mean),
+            "upper": float(row.Upper),
+            "lower": float(row.Lower),
+            "deviation": float(row.Deviation),
+            "direction": row.Direction,
+            "new": bool(row.New),
+        }
+        for city, row in zip(breaches.index, breaches.head(limit).itertuples(index=False))
+    ]
+    return arbitrage.compute_valuation_panel().dates[position], records
+
+
+SEASONALITY_SORT_COLUMNS = {
+    "seasonal_strength": "Seasonal_Strength",
+    "trend_strength": "Trend_Strength",
+    "seasonal_f": "Seasonal_F",
+    "trend_f": "Trend_F",
+}
+
+
+def _seasonality_record(city: str, features: pd.Series, tests: pd.Series) -> Dict[str, Any]:
+    return {
+        "city": city,
+        "trend_strength": _finite(features["Trend_Strength"]),
+        "seasonal_strength": _finite(features["Seasonal_Strength"]),
+        "trend_f": _finite(features["Trend_F"]),
+        "seasonal_f": _finite(features["Seasonal_F"]),
+        "adf_stat": _finite(tests["ADF_Stat"]),
+        "adf_pvalue": _finite(tests["ADF_PValue"]),
+        "adf_lags": int(tests["ADF_Lags"]) if tests["ADF_Lags"] >= 0 else None,
+    }
+
+
+def get_seasonality_rankings(
+    by: str = "seasonal_strength",
+    limit: int = 20,
+    max_adf_pvalue: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    analysis = _get_rent_analysis()
+    features = analysis.get_seasonal_decomposition().features
+    tests = analysis.get_stationarity_tests()
+    keep = features[SEASONALITY_SORT_COLUMNS[by]].notna().to_numpy()
+    if max_adf_pvalue is not None:
+        keep &= (tests["ADF_PValue"] <= max_adf_pvalue).to_numpy()
+
+    positions = np.flatnonzero(keep)
+    order = positions[np.argsort(-features[SEASONALITY_SORT_COLUMNS[by]].to_numpy()[positions], kind="stable")]
+    return [
+        _seasonality_record(features.index[position], features.iloc[position], tests.iloc[position])
+        for position in order[:limit]
+    ]
+
+
+def get_seasonal_decomposition(city_name: str, model: str = "additive") -> Dict[str, Any]:
+    analysis = _get_rent_analysis()
+    resolved = analysis.resolve_asset_name(city_name)
+    if resolved is None:
+        raise ValueError(analysis._not_found_message(city_name))
+
+    position = analysis._get_asset_positions()[resolved]
+    decomposition = analysis.get_seasonal_decomposition(model=model)
+    record = _seasonality_record(
+        resolved,
+        decomposition.features.iloc[position],
+        analysis.get_stationarity_tests().iloc[position],
+    )
+
+    observed = analysis.data.iloc[:, position].to_numpy(dtype=np.float64)
+    seasonal = decomposition.seasonal[:, position]
+    months = pd.to_datetime(pd.Index(decomposition.dates)).month
+    profile: Dict[int, float] = {}
+    for month, value in zip(months, seasonal):
+        if np.isfinite(value):
+            profile.setdefault(int(month), float(value))
+
+    record["model"] = model
+    record["seasonal_profile"] = [
+        {"month": MONTH_ABBREVIATIONS[month - 1], "value": profile[month]} for month in sorted(profile)
+    ]
+    record["components"] = [
+        {
+            "date": date,
+            "observed": _finite(observed[row]),
+            "trend": _finite(decomposition.trend[row, position]),
+            "seasonal": _finite(seasonal[row]),
+            "residual": _finite(decomposition.resid[row, position]),
+        }
+        for row, date in enumerate(decomposition.dates)
+        if np.isfinite(observed[row])
+    ]
+    return record
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+import contextvars
+import os
+from pathlib import Path
+import re
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_request_phases: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_phases", default=None
+)
+_active_sampler: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar(
+    "active_sampler", default=None
+)
+_METRIC_NAME = re.compile(r"[^a-zA-Z0-9_]")
+_TIMING_NAME = re.compile(r"[^a-zA-Z0-9_.-]")
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._phase_seconds: Dict[str, _Histogram] = {}
+        self._phase_memory: Dict[str, Tuple[int, int]] = {}
+        self._requests: Dict[Tuple[str, str, str], _Histogram] = {}
+
+    def observe_phase(self, name: str, seconds: float, memory_delta: int) -> None:
+        with self._lock:
+            self._phase_seconds.setdefault(name, _Histogram()).observe(seconds)
+            total, last = self._phase_memory.get(name, (0, 0))
+            self._phase_memory[name] = (total + memory_delta, memory_delta)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._requests.setdefault((method, route, str(status)), _Histogram()).observe(seconds)
+
+    def render(self, gauges: Iterable[Tuple[str, Dict[str, str], float]] = ()) -> str:
+        lines: List[str] = []
+        with self._lock:
+            lines += _histogram_lines(
+                "inference_phase_duration_seconds",
+                "Duration of instrumented inference phases.",
+                {(("phase", name),): histogram for name, histogram in self._phase_seconds.items()},
+            )
+            lines += [
+                "# HELP inference_phase_memory_delta_bytes_total Resident memory change summed over phase runs.",
+                "# TYPE inference_phase_memory_delta_bytes_total counter",
+            ]
+            lines += [
+                f'inference_phase_memory_delta_bytes_total{{phase="{name}"}} {total}'
+                for name, (total, _) in sorted(self._phase_memory.items())
+            ]
+            lines += [
+                "# HELP inference_phase_memory_last_delta_bytes Resident memory change of the latest phase run.",
+                "# TYPE inference_phase_memory_last_delta_bytes gauge",
+            ]
+            lines += [
+                f'inference_phase_memory_last_delta_bytes{{phase="{name}"}} {last}'
+                for name, (_, last) in sorted(self._phase_memory.items())
+            ]
+            lines += _histogram_lines(
+                "inference_http_request_duration_seconds",
+                "HTTP request latency by route.",
+                {
+                    (("method", method), ("route", route), ("status", status)): histogram
+                    for (method, route, status), histogram in self._requests.items()
+                },
+            )
+
+        typed = set()
+        for name, labels, value in sorted(gauges, key=lambda gauge: gauge[0]):
+            metric = _METRIC_NAME.sub("_", name)
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_labels(tuple(labels.items()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _histogram_lines(name: str, help_text: str, series: Dict[Tuple[Tuple[str, str], ...], _Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in sorted(series.items()):
+        for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+            lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {count}")
+        lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.total}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+metrics = MetricsRegistry()
+
+
+def record_phase(name: str, seconds: float, memory_delta: int) -> None:
+    metrics.observe_phase(name, seconds, memory_delta)
+    phases = _request_phases.get()
+    if phases is not None:
+        phases.append((name, seconds))
+
+
+def start_request() -> contextvars.Token:
+    return _request_phases.set([])
+
+
+def finish_request(token: contextvars.Token) -> List[Tuple[str, float]]:
+    phases = _request_phases.get() or []
+    _request_phases.reset(token)
+    return phases
+
+
+def server_timing_header(phases: List[Tuple[str, float]], total_seconds: float) -> str:
+    # Repeated phases (e.g. one per batch item) are summed into a single entry.
+    totals: Dict[str, float] = {}
+    for name, seconds in phases:
+        totals[name] = totals.get(name, 0.0) + seconds
+    entries = [f"{_TIMING_NAME.sub('_', name)};dur={seconds * 1000:.2f}" for name, seconds in totals.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="inference-profiler", daemon=True)
+        self._threads: set[int] = set()
+        self._threads_lock = threading.Lock()
+        self._token: Optional[contextvars.Token] = None
+
+    def start(self) -> "StackSampler":
+        # Compute calls made from this context register their worker thread through sampled().
+        self._token = _active_sampler.set(self)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self._token is not None:
+            _active_sampler.reset(self._token)
+            self._token = None
+
+    @contextmanager
+    def tracking(self) -> Iterator[None]:
+        thread_id = threading.get_ident()
+        with self._threads_lock:
+            self._threads.add(thread_id)
+        try:
+            yield
+        finally:
+            with self._threads_lock:
+                self._threads.discard(thread_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                threads = set(self._threads)
+            # Only threads currently running this request's compute; other requests share the pool.
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in threads:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Collapsed-stack format, readable by flamegraph.pl and speedscope.
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.samples.most_common()))
+
+
+def sampled(func: Callable[..., T], *args: Any) -> T:
+    sampler = _active_sampler.get()
+    if sampler is None:
+        return func(*args)
+    with sampler.tracking():
+        return func(*args)
+
+
+class ProfilerSettings:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("INFERENCE_PROFILING", "").lower() in ("1", "true", "yes")
+        self.min_seconds = float(os.environ.get("INFERENCE_PROFILE_MIN_MS", "0")) / 1000
+        self.interval = float(os.environ.get("INFERENCE_PROFILE_INTERVAL_MS", "5")) / 1000
+        self.directory = Path(
+            os.environ.get("INFERENCE_PROFILE_DIR", Path(tempfile.gettempdir()) / "inference-profiles")
+        )
+
+    def profile_path(self, method: str, route: str) -> Path:
+        slug = _METRIC_NAME.sub("_", f"{method}_{route}").strip("_")
+        return self.directory / f"{time.strftime('%Y%m%dT%H%M%S')}-{time.perf_counter_ns()}-{slug}.collapsed"
+
+
+profiler_settings = ProfilerSettings()
+
+
+def gauges_from(prefix: str, values: Dict[str, Any], labels: Optional[Dict[str, str]] = None) -> List[Tuple[str, Dict[str, str], float]]:
+    return [
+        (f"{prefix}_{key}", labels or {}, float(value))
+        for key, value in values.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
@@ -1,14 +1,144 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+import functools
+import hmac
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Hashable, Literal, Optional, TypeVar
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from .schemas import (
+    BandBreachesResponse,
+    CitySuggestResponse,
+    ClusterPeersResponse,
+    CorrelatedPeersResponse,
+    FrontierBatchRequest,
+    FrontierBatchResponse,
+    FrontierResponse,
+    LocationResponse,
+    PortfolioOptimizeRequest,
+    PortfolioOptimizeResponse,
+    RiskRequest,
+    RiskResponse,
+    SeasonalPricesBatchRequest,
+    SeasonalPricesBatchResponse,
+    SeasonalPricesResponse,
+    SeasonalDecompositionResponse,
+    SeasonalityRankingsResponse,
+    ValuationHistoryResponse,
+    ValuationOpportunitiesResponse,
+)
+from .data import build_risk_response, validate_location
+from .executor import ComputeExecutor, ComputeQueueFull, ComputeTimeout
+from .instrumentation import (
+    StackSampler,
+    finish_request,
+    gauges_from,
+    metrics,
+    profiler_settings,
+    record_phase,
+    sampled,
+    server_timing_header,
+    start_request,
+)
+from .response_cache import ResponseCache, etag_matches
+from .inference_service import (
+    DatasetUnavailable,
+    current_rss_bytes,
+    get_band_breaches,
+    get_cluster_peers,
+    get_cache_identity,
+    get_correlated_peers,
+    get_engine_status,
+    get_location_summary,
+    get_mean_monthly_prices,
+    get_mean_monthly_prices_batch,
+    get_region_risk_score,
+    get_seasonal_decomposition,
+    get_seasonality_rankings,
+    get_top_cities_with_better_return_at_risk,
+    get_top_cities_with_better_return_at_risk_batch,
+    get_valuation_history,
+    get_valuation_opportunities,
+    optimize_portfolio_scenarios,
+    peek_cache_identity,
+    phase,
+    refresh_engine,
+    set_phase_listener,
+    start_prewarm,
+    suggest_cities,
+    warm_up,
+)
+
+T = TypeVar("T")
+
+compute = ComputeExecutor.from_env(initializer=warm_up)
+response_cache = ResponseCache(max_entries=int(os.environ.get("INFERENCE_RESPONSE_CACHE_SIZE", "1024")))
+CACHE_CONTROL = f"public, max-age={int(os.environ.get('INFERENCE_CACHE_MAX_AGE', '300'))}"
+ADMIN_TOKEN = os.environ.get("INFERENCE_ADMIN_TOKEN")
+
+set_phase_listener(record_phase)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_prewarm()
+    yield
+    compute.shutdown()
+
+
+async def run_compute(func: Callable[..., T], *args: Any) -> T:
+    try:
+        with phase(f"compute.{func.__name__}"):
+            # sampled() lets a profiled request's sampler follow the worker thread running this call.
+            return await compute.run(functools.partial(sampled, func), *args)
+    except ComputeQueueFull as exc:
+        raise HTTPException(status_code=503, detail="Server busy, retry shortly") from exc
+    except ComputeTimeout as exc:
+        raise HTTPException(status_code=504, detail="Computation timed out") from exc
+
+
+async def cache_identity(city: Optional[str] = None) -> tuple[str, Optional[str]]:
+    # The dataset fingerprint, plus the resolved city so every spelling of a name shares one entry.
+    identity = peek_cache_identity(city)
+    if identity is None:
+        # No engine here and no published version (first build running, or shared arrays off): ask the executor.
+        identity = await run_compute(get_cache_identity, city)
+    return identity
+
+
+async def cached_json_response(
+    request: Request,
+    fingerprint: str,
+    key: tuple[Hashable, ...],
+    build: Callable[[], Awaitable[BaseModel]],
+) -> Response:
+    # The fingerprint is captured before building. A body computed while the engine is swapped is
+    # stored under the old version's key, which is never looked up again.
+    entry = response_cache.get((fingerprint, *key))
+
+    if entry is None:
+        model = await build()
+        with phase("serialize"):
+            body = model.model_dump_json().encode()
+        entry = response_cache.put((fingerprint, *key), body)
+
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
-from .schemas import FrontierResponse, RiskRequest, RiskResponse, SeasonalPricesResponse
-from .data import build_mock_response, validate_location
-from .inference_service import get_mean_monthly_prices, get_top_cities_with_better_return_at_risk
 
 app = FastAPI(
     title="Real Estate Risk Assessment API",
     version="0.1.0",
-    description="Mock API for real estate investment risk assessment",
+    description="API for dataset-backed real estate investment risk assessment",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -27,47 +157,396 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    profiling = profiler_settings.enabled and request.headers.get("x-profile") == "1"
+    sampler = StackSampler(profiler_settings.interval).start() if profiling else None
+    token = start_request()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        phases = finish_request(token)
+        if sampler is not None:
+            sampler.stop()
+        # Label by route template so path parameters cannot blow up metric cardinality.
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.observe_request(request.method, route, status, elapsed)
+
+    response.headers["Server-Timing"] = server_timing_header(phases, elapsed)
+    if sampler is not None and elapsed >= profiler_settings.min_seconds:
+        path = profiler_settings.profile_path(request.method, route)
+        await asyncio.to_thread(sampler.dump, path)
+        response.headers["X-Profile"] = path.name
+    return response
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> Response:
+    engine = get_engine_status()
+    gauges = [
+        ("inference_engine_ready", {}, float(engine["ready"])),
+        ("inference_process_resident_bytes", {}, float(current_rss_bytes())),
+        *[("inference_engine_build_seconds", {"phase": name}, seconds) for name, seconds in engine["timings"].items()],
+        *gauges_from("inference_executor", compute.stats()),
+        *gauges_from("inference_response_cache", response_cache.stats()),
+    ]
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
-async def health_check() -> dict:
-    return {"status": "ok"}
+async def health_check(response: Response) -> dict:
+    engine = get_engine_status()
+    if engine["ready"]:
+        status = "ok"
+    elif engine["error"]:
+        status = "error"
+    elif engine["loading"]:
+        status = "warming"
+    else:
+        status = "idle"
+
+    # With prewarming disabled the engine loads on first use, so an idle engine is not a failure.
+    if not engine["ready"] and engine["prewarm"] != "off":
+        response.status_code = 503
+    return {
+        "status": status,
+        "engine": engine,
+        "executor": compute.stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+
+@app.post("/admin/refresh")
+async def admin_refresh(x_admin_token: Optional[str] = Header(None)) -> dict:
+    # The endpoint does not exist unless an admin token is configured.
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        # Refreshes can outlast the per-request compute timeout, so they bypass the compute pool.
+        result = await asyncio.to_thread(refresh_engine)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    if result["mode"] != "unchanged":
+        # Responses still being built are stored under the fingerprint they started with, so
+        # anything put after this clear is keyed to the old data and never served again.
+        response_cache.clear()
+        compute.restart_workers()
+    return result
 
 
 @app.post("/risk-assessment", response_model=RiskResponse)
 async def risk_assessment(payload: RiskRequest) -> RiskResponse:
     if not validate_location(payload):
         raise HTTPException(status_code=400, detail="Invalid location input")
-    return build_mock_response(payload)
+
+    try:
+        score = await run_compute(get_region_risk_score, payload.query, payload.location_type.value)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return build_risk_response(payload, score)
 
 
 @app.get("/frontier-comparables", response_model=FrontierResponse)
-async def frontier_comparables(city: str, top_n: int = 3) -> FrontierResponse:
-    if len(city.strip()) < 2:
+async def frontier_comparables(request: Request, city: str, top_n: int = Query(3, ge=1, le=50)) -> Response:
+    city = city.strip()
+    if len(city) < 2:
         raise HTTPException(status_code=400, detail="City name too short")
 
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> FrontierResponse:
+        try:
+            results = await run_compute(get_top_cities_with_better_return_at_risk, city, top_n)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return FrontierResponse(
+            results=[
+                {"city": name, "risk_score": risk_score, "return_score": return_score}
+                for name, risk_score, return_score in results
+            ]
+        )
+
+    return await cached_json_response(request, fingerprint, ("frontier-comparables", city, top_n), build)
+
+
+@app.post("/frontier-comparables/batch", response_model=FrontierBatchResponse)
+async def frontier_comparables_batch(payload: FrontierBatchRequest) -> FrontierBatchResponse:
+    results, missing = await run_compute(
+        get_top_cities_with_better_return_at_risk_batch, payload.cities, payload.top_n
+    )
+
+    return FrontierBatchResponse(
+        results=[
+            {
+                "city": city,
+                "results": [
+                    {"city": name, "risk_score": risk_score, "return_score": return_score}
+                    for name, risk_score, return_score in comparables
+                ],
+            }
+            for city, comparables in results.items()
+        ],
+        missing=missing,
+    )
+
+
+@app.post("/portfolio/optimize", response_model=PortfolioOptimizeResponse)
+async def portfolio_optimize(payload: PortfolioOptimizeRequest) -> PortfolioOptimizeResponse:
     try:
-        results = get_top_cities_with_better_return_at_risk(city, top_n=top_n)
+        cities, missing, results = await run_compute(
+            optimize_portfolio_scenarios,
+            payload.cities,
+            [scenario.model_dump() for scenario in payload.scenarios],
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return FrontierResponse(
+    return PortfolioOptimizeResponse(cities=cities, missing=missing, results=results)
+
+
+@app.get("/seasonal-prices", response_model=SeasonalPricesResponse)
+async def seasonal_prices(request: Request, city: str) -> Response:
+    city = city.strip()
+    if len(city) < 2:
+        raise HTTPException(status_code=400, detail="City name too short")
+
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> SeasonalPricesResponse:
+        try:
+            monthly = await run_compute(get_mean_monthly_prices, city)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return SeasonalPricesResponse(
+            city=city,
+            monthly=[{"month": month, "value": value} for month, value in monthly],
+        )
+
+    return await cached_json_response(request, fingerprint, ("seasonal-prices", city), build)
+
+
+@app.post("/seasonal-prices/batch", response_model=SeasonalPricesBatchResponse)
+async def seasonal_prices_batch(payload: SeasonalPricesBatchRequest) -> SeasonalPricesBatchResponse:
+    results, missing = await run_compute(get_mean_monthly_prices_batch, payload.cities)
+
+    return SeasonalPricesBatchResponse(
         results=[
-            {"city": name, "risk_score": risk_score, "return_score": return_score}
-            for name, risk_score, return_score in results
-        ]
+            {"city": city, "monthly": [{"month": month, "value": value} for month, value in monthly]}
+            for city, monthly in results.items()
+        ],
+        missing=missing,
     )
 
 
-@app.get("/seasonal-prices", response_model=SeasonalPricesResponse)
-async def seasonal_prices(city: str) -> SeasonalPricesResponse:
-    if len(city.strip()) < 2:
+@app.get("/cities/suggest", response_model=CitySuggestResponse)
+async def city_suggest(request: Request, q: str, limit: int = Query(10, ge=1, le=50)) -> Response:
+    query = q.strip()
+    fingerprint, _ = await cache_identity()
+
+    async def build() -> CitySuggestResponse:
+        suggestions = await run_compute(suggest_cities, query, limit) if query else []
+        return CitySuggestResponse(query=query, suggestions=suggestions)
+
+    return await cached_json_response(request, fingerprint, ("cities-suggest", query.casefold(), limit), build)
+
+
+@app.get("/cities/cluster-peers", response_model=ClusterPeersResponse)
+async def city_cluster_peers(
+    request: Request,
+    city: str,
+    n_clusters: int = Query(5, ge=2, le=50),
+    limit: int = Query(10, ge=1, le=100),
+) -> Response:
+    city = city.strip()
+    if len(city) < 2:
+        raise HTTPException(status_code=400, detail="City name too short")
+
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> ClusterPeersResponse:
+        try:
+            return ClusterPeersResponse(**await run_compute(get_cluster_peers, city, n_clusters, limit))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    key = ("cities-cluster-peers", city, n_clusters, limit)
+    return await cached_json_response(request, fingerprint, key, build)
+
+
+@app.get("/cities/correlated-peers", response_model=CorrelatedPeersResponse)
+async def city_correlated_peers(request: Request, city: str, k: int = Query(10, ge=1, le=100)) -> Response:
+    city = city.strip()
+    if len(city) < 2:
         raise HTTPException(status_code=400, detail="City name too short")
 
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> CorrelatedPeersResponse:
+        try:
+            return CorrelatedPeersResponse(**await run_compute(get_correlated_peers, city, k))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return await cached_json_response(request, fingerprint, ("cities-correlated-peers", city, k), build)
+
+
+@app.get("/locations/lookup", response_model=LocationResponse)
+async def location_lookup(
+    query: str,
+    code_type: Optional[Literal["zip", "fips", "region_id"]] = None,
+) -> LocationResponse:
+    if len(query.strip()) < 2:
+        raise HTTPException(status_code=400, detail="Location query too short")
+
     try:
-        monthly = get_mean_monthly_prices(city)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
+        summary = await run_compute(get_location_summary, query, code_type)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    def finite(value: float) -> Optional[float]:
+        return value if math.isfinite(value) else None
 
-    return SeasonalPricesResponse(
-        city=city,
-        monthly=[{"month": month, "value": value} for month, value in monthly],
+    return LocationResponse(
+        label=summary.label,
+        level=summary.level,
+        region_id=summary.region_id,
+        fips=summary.fips,
+        state=summary.state,
+        latest_rent=summary.latest_rent,
+        annual_change=finite(summary.annual_change),
+        volatility=finite(summary.volatility),
+        beta=finite(summary.beta),
+        risk_score=summary.risk.risk_score if summary.risk is not None else None,
     )
+
+
+@app.get("/valuation/opportunities", response_model=ValuationOpportunitiesResponse)
+async def valuation_opportunities(
+    request: Request,
+    date: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    min_correlation: Optional[float] = Query(None, ge=-1, le=1),
+) -> Response:
+    fingerprint, _ = await cache_identity()
+
+    async def build() -> ValuationOpportunitiesResponse:
+        try:
+            as_of, undervalued, overvalued = await run_compute(
+                get_valuation_opportunities, date, limit, min_correlation
+            )
+        except DatasetUnavailable as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return ValuationOpportunitiesResponse(date=as_of, undervalued=undervalued, overvalued=overvalued)
+
+    key = ("valuation-opportunities", date, limit, min_correlation)
+    return await cached_json_response(request, fingerprint, key, build)
+
+
+@app.get("/valuation/history", response_model=ValuationHistoryResponse)
+async def valuation_history(request: Request, city: str) -> Response:
+    city = city.strip()
+    if len(city) < 2:
+        raise HTTPException(status_code=400, detail="City name too short")
+
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> ValuationHistoryResponse:
+        try:
+            label, history = await run_compute(get_valuation_history, city)
+        except DatasetUnavailable as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return ValuationHistoryResponse(
+            city=label,
+            history=[{"date": date, "z_score": z_score} for date, z_score in history],
+        )
+
+    return await cached_json_response(request, fingerprint, ("valuation-history", city), build)
+
+
+@app.get("/valuation/band-breaches", response_model=BandBreachesResponse)
+async def valuation_band_breaches(
+    request: Request,
+    window: int = Query(24, ge=0, le=120),
+    n_std: float = Query(2.0, gt=0, le=5),
+    date: Optional[str] = None,
+    direction: Optional[Literal["above", "below"]] = None,
+    limit: int = Query(50, ge=1, le=500),
+) -> Response:
+    if window == 1:
+        raise HTTPException(status_code=400, detail="window must be 0 (full history) or at least 2")
+
+    fingerprint, _ = await cache_identity()
+
+    async def build() -> BandBreachesResponse:
+        try:
+            as_of, breaches = await run_compute(get_band_breaches, window or None, n_std, date, direction, limit)
+        except DatasetUnavailable as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        return BandBreachesResponse(date=as_of, window=window or None, n_std=n_std, breaches=breaches)
+
+    key = ("valuation-band-breaches", window, n_std, date, direction, limit)
+    return await cached_json_response(request, fingerprint, key, build)
+
+
+@app.get("/seasonality/rankings", response_model=SeasonalityRankingsResponse)
+async def seasonality_rankings(
+    request: Request,
+    by: Literal["seasonal_strength", "trend_strength", "seasonal_f", "trend_f"] = "seasonal_strength",
+    limit: int = Query(20, ge=1, le=500),
+    max_adf_pvalue: Optional[float] = Query(None, ge=0, le=1),
+) -> Response:
+    fingerprint, _ = await cache_identity()
+
+    async def build() -> SeasonalityRankingsResponse:
+        cities = await run_compute(get_seasonality_rankings, by, limit, max_adf_pvalue)
+        return SeasonalityRankingsResponse(by=by, cities=cities)
+
+    key = ("seasonality-rankings", by, limit, max_adf_pvalue)
+    return await cached_json_response(request, fingerprint, key, build)
+
+
+@app.get("/seasonality/decomposition", response_model=SeasonalDecompositionResponse)
+async def seasonality_decomposition(
+    request: Request,
+    city: str,
+    model: Literal["additive", "multiplicative"] = "additive",
+) -> Response:
+    city = city.strip()
+    if len(city) < 2:
+        raise HTTPException(status_code=400, detail="City name too short")
+
+    fingerprint, resolved = await cache_identity(city)
+    city = resolved or city
+
+    async def build() -> SeasonalDecompositionResponse:
+        try:
+            record = await run_compute(get_seasonal_decomposition, city, model)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return SeasonalDecompositionResponse(**record)
+
+    return await cached_json_response(request, fingerprint, ("seasonality-decomposition", city, model), build)
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -43,14 +43,29 @@ class RiskResponse(BaseModel):
 
 class FrontierComparable(BaseModel):
     city: str
-    risk_score: float = Field(..., ge=0, le=100)
-    return_score: float = Field(..., ge=0, le=100)
+    risk_score: Optional[float] = Field(None, ge=0, le=100)
+    return_score: Optional[float] = Field(None, ge=0, le=100)
 
 
 class FrontierResponse(BaseModel):
     results: List[FrontierComparable]
 
 
+class FrontierBatchRequest(BaseModel):
+    cities: List[str] = Field(..., min_length=1, max_length=100)
+    top_n: int = Field(3, ge=1, le=50)
+
+
+class CityFrontier(BaseModel):
+    city: str
+    results: List[FrontierComparable]
+
+
+class FrontierBatchResponse(BaseModel):
+    results: List[CityFrontier]
+    missing: List[str]
+
+
 class SeasonalPricePoint(BaseModel):
     month: str
     value: int
@@ -59,3 +74,164 @@ class SeasonalPricePoint(BaseModel):
 class SeasonalPricesResponse(BaseModel):
     city: str
     monthly: List[SeasonalPricePoint]
+
+
+class SeasonalPricesBatchRequest(BaseModel):
+    cities: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class SeasonalPricesBatchResponse(BaseModel):
+    results: List[SeasonalPricesResponse]
+    missing: List[str]
+
+
+class PortfolioScenario(BaseModel):
+    name: Optional[str] = Field(None, max_length=64)
+    max_weight: float = Field(1.0, gt=0, le=1)
+    target_return: Optional[float] = None
+    target_volatility: Optional[float] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def single_target(self) -> "PortfolioScenario":
+        if self.target_return is not None and self.target_volatility is not None:
+            raise ValueError("Set at most one of target_return and target_volatility")
+        return self
+
+
+class PortfolioOptimizeRequest(BaseModel):
+    cities: List[str] = Field(..., min_length=1, max_length=200)
+    scenarios: List[PortfolioScenario] = Field(default_factory=lambda: [PortfolioScenario()], min_length=1, max_length=500)
+
+
+class PortfolioWeight(BaseModel):
+    city: str
+    weight: float
+
+
+class PortfolioResult(BaseModel):
+    name: Optional[str] = None
+    success: bool
+    message: str = ""
+    expected_return: Optional[float] = None
+    volatility: Optional[float] = None
+    weights: List[PortfolioWeight]
+
+
+class PortfolioOptimizeResponse(BaseModel):
+    cities: List[str]
+    missing: List[str]
+    results: List[PortfolioResult]
+
+
+class CitySuggestResponse(BaseModel):
+    query: str
+    suggestions: List[str]
+
+
+class CorrelatedCity(BaseModel):
+    city: str
+    correlation: float
+
+
+class ClusterPeersResponse(BaseModel):
+    city: str
+    cluster: int
+    cluster_size: int
+    peers: List[CorrelatedCity]
+
+
+class CorrelatedPeersResponse(BaseModel):
+    city: str
+    most_correlated: List[CorrelatedCity]
+    least_correlated: List[CorrelatedCity]
+
+
+class LocationResponse(BaseModel):
+    label: str
+    level: str
+    region_id: int
+    fips: Optional[int] = None
+    state: str
+    latest_rent: float
+    annual_change: Optional[float] = None
+    volatility: Optional[float] = None
+    beta: Optional[float] = None
+    risk_score: Optional[int] = Field(None, ge=0, le=100)
+
+
+class ValuationEntry(BaseModel):
+    city: str
+    z_score: float
+    price: float
+    rent: float
+    predicted_price: float
+    correlation: Optional[float] = None
+
+
+class ValuationOpportunitiesResponse(BaseModel):
+    date: str
+    undervalued: List[ValuationEntry]
+    overvalued: List[ValuationEntry]
+
+
+class ValuationHistoryPoint(BaseModel):
+    date: str
+    z_score: float
+
+
+class ValuationHistoryResponse(BaseModel):
+    city: str
+    history: List[ValuationHistoryPoint]
+
+
+class BandBreach(BaseModel):
+    city: str
+    ratio: float
+    mean: float
+    upper: float
+    lower: float
+    deviation: float
+    direction: Literal["above", "below"]
+    new: bool
+
+
+class BandBreachesResponse(BaseModel):
+    date: str
+    window: Optional[int] = None
+    n_std: float
+    breaches: List[BandBreach]
+
+
+class SeasonalityFeatures(BaseModel):
+    city: str
+    trend_strength: Optional[float] = None
+    seasonal_strength: Optional[float] = None
+    trend_f: Optional[float] = None
+    seasonal_f: Optional[float] = None
+    adf_stat: Optional[float] = None
+    adf_pvalue: Optional[float] = None
+    adf_lags: Optional[int] = None
+
+
+class SeasonalityRankingsResponse(BaseModel):
+    by: str
+    cities: List[SeasonalityFeatures]
+
+
+class SeasonalProfilePoint(BaseModel):
+    month: str
+    value: float
+
+
+class DecompositionPoint(BaseModel):
+    date: str
+    observed: Optional[float] = None
+    trend: Optional[float] = None
+    seasonal: Optional[float] = None
+    residual: Optional[float] = None
+
+
+class SeasonalDecompositionResponse(SeasonalityFeatures):
+    model: Literal["additive", "multiplicative"]
+    seasonal_profile: List[SeasonalProfilePoint]
+    components: List[DecompositionPoint]
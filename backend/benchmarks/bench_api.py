@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from app.inference_service import _get_rent_analysis, warm_up
+from app.main import app, compute, response_cache
+from benchmarks.common import write_results
+
+# Each factory maps a request number to (method, path, query params, JSON body).
+RequestFactory = Callable[[int], tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+
+
+def _scenarios(cities: List[str], top_n: int) -> Dict[str, RequestFactory]:
+    def pick(i: int) -> str:
+        return cities[i % len(cities)]
+
+    return {
+        "GET /health": lambda i: ("GET", "/health", None, None),
+        "GET /frontier-comparables": lambda i: (
+            "GET",
+            "/frontier-comparables",
+            {"city": pick(i), "top_n": top_n},
+            None,
+        ),
+        "GET /seasonal-prices": lambda i: ("GET", "/seasonal-prices", {"city": pick(i)}, None),
+        "GET /cities/suggest": lambda i: ("GET", "/cities/suggest", {"q": pick(i)[:3]}, None),
+        "POST /risk-assessment": lambda i: (
+            "POST",
+            "/risk-assessment",
+            None,
+            {"query": pick(i), "location_type": "city"},
+        ),
+        "POST /frontier-comparables/batch": lambda i: (
+            "POST",
+            "/frontier-comparables/batch",
+            None,
+            {"cities": [pick(i + offset) for offset in range(10)], "top_n": top_n},
+        ),
+        "POST /portfolio/optimize": lambda i: (
+            "POST",
+            "/portfolio/optimize",
+            None,
+            {
+                "cities": [pick(i + offset) for offset in range(10)],
+                "scenarios": [{"max_weight": 0.3}, {"max_weight": 0.2}, {"max_weight": 0.5}],
+            },
+        ),
+    }
+
+
+async def _load(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    total: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    counter = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def worker() -> None:
+        while (i := next(counter)) < total:
+            method, path, params, body = factory(i)
+            started = time.perf_counter()
+            response = await client.request(method, path, params=params, json=body)
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    samples = np.asarray(latencies)
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": total / elapsed,
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "mean": float(samples.mean()),
+        "max": float(samples.max()),
+        "statuses": statuses,
+    }
+
+
+async def run(requests: int, concurrency: int, cities: int, top_n: int, cold_cache: bool) -> Dict[str, Any]:
+    warm_up()
+    names = list(_get_rent_analysis().returns.columns[:cities])
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, factory in _scenarios(names, top_n).items():
+            if cold_cache:
+                response_cache.clear()
+            print(f"Loading {name}...")
+            results[name] = await _load(client, factory, requests, concurrency)
+    compute.shutdown()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="In-process load test of the FastAPI endpoints.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cities", type=int, default=100, help="Distinct cities to cycle through.")
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--cold-cache", action="store_true", help="Clear the response cache before each endpoint.")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    config = vars(args).copy()
+    config["output"] = str(args.output) if args.output else None
+    results = asyncio.run(run(args.requests, args.concurrency, args.cities, args.top_n, args.cold_cache))
+    path = write_results("api", results, config, args.output)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
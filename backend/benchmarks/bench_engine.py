@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import copy
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Imported first: it puts the inference engine on sys.path.
+from benchmarks.common import summarize_seconds, time_call, write_results
+
+from datasets import load_default_datasets
+from market_arbitrage import MarketArbitrage
+from risk_analysis import RiskAnalysis
+
+DEFAULT_SIZES = ("35", "500", "full")
+
+
+def _universe(columns: List[str], size: str) -> List[str]:
+    return columns if size == "full" else columns[: int(size)]
+
+
+def _bench_size(datasets: Any, size: str, repeat: int, frontier_points: int, max_frontier_assets: int) -> Dict[str, Any]:
+    priced = set(datasets.value_ts.columns) if datasets.value_ts is not None else None
+    names = _universe([name for name in datasets.rent_ts.columns if priced is None or name in priced], size)
+    results: Dict[str, Any] = {"assets": len(names)}
+
+    def build(frame: Any, us_avg: Any) -> RiskAnalysis:
+        return RiskAnalysis(df=frame, asset_names_or_number=names, us_avg=us_avg, risk_free_rate=0.0)
+
+    results["risk_analysis.init"], rent_analysis = time_call(
+        lambda: build(datasets.rent_ts, datasets.us_avg_rent), repeat
+    )
+    price_analysis = build(datasets.value_ts, datasets.us_avg_value) if priced is not None else None
+
+    data = rent_analysis.data
+    results["risk_analysis.returns"], _ = time_call(lambda: data.pct_change().dropna(), repeat)
+    results["risk_analysis.correlation"], _ = time_call(lambda: rent_analysis.returns.corr(), repeat)
+    results["risk_analysis.cov"], _ = time_call(lambda: rent_analysis.returns.cov(), repeat)
+    results["risk_analysis.capm_vectorized"], _ = time_call(rent_analysis.get_alpha_and_beta, repeat)
+    # The per-asset statsmodels loop is the reference implementation; it is too slow to repeat at full size.
+    results["risk_analysis.capm_ols"], _ = time_call(rent_analysis._get_alpha_and_beta_ols, 1)
+
+    results["risk_index.build"], _ = time_call(lambda: _fresh(rent_analysis).get_risk_return_index(), repeat)
+    results["seasonal_table.build"], _ = time_call(lambda: _fresh(rent_analysis).get_seasonal_table(), repeat)
+    results["seasonal_decomposition.build"], _ = time_call(
+        lambda: _fresh(rent_analysis).get_seasonal_decomposition(), repeat
+    )
+    results["return_clusters.build"], _ = time_call(
+        lambda: _fresh(rent_analysis).get_return_clusters().labels(5), repeat
+    )
+    results["correlation_index.build"], _ = time_call(lambda: _fresh(rent_analysis).get_correlation_index(), repeat)
+    results["adf.build"], _ = time_call(lambda: _fresh(rent_analysis).get_stationarity_tests(), repeat)
+    rent_analysis.prepare_serving_indexes()
+
+    probes = names[: min(len(names), 50)]
+    results["top_cities_with_better_return_at_risk"] = _per_call(
+        lambda name: rent_analysis.top_cities_with_better_return_at_risk(name, top_n=3), probes, repeat
+    )
+    results["correlated_peers"] = _per_call(lambda name: rent_analysis.correlated_peers(name, k=10), probes, repeat)
+    results["get_mean_monthly_prices"] = _per_call(rent_analysis.get_mean_monthly_prices, probes, repeat)
+
+    if price_analysis is not None:
+        results["market_arbitrage.init"], _ = time_call(lambda: MarketArbitrage(rent_analysis, price_analysis), repeat)
+    else:
+        results["market_arbitrage.init"] = {"skipped": "no home value data"}
+
+    if len(names) <= max_frontier_assets:
+        results["efficient_frontier"], _ = time_call(
+            lambda: rent_analysis.compute_efficient_frontier(n_points=frontier_points), 1
+        )
+    else:
+        results["efficient_frontier"] = {"skipped": f"more than {max_frontier_assets} assets"}
+    return results
+
+
+def _fresh(analysis: RiskAnalysis) -> RiskAnalysis:
+    # A shallow copy with cleared caches times a cold build without re-running __init__.
+    clone = copy.copy(analysis)
+    clone._reset_caches()
+    return clone
+
+
+def _per_call(func: Any, names: List[str], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        for name in names:
+            stats, _ = time_call(lambda: func(name), 1)
+            samples.append(stats["median"])
+    return summarize_seconds(samples)
+
+
+def run(sizes: List[str], repeat: int, frontier_points: int, max_frontier_assets: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    results["load_default_datasets.cold"], datasets = time_call(lambda: load_default_datasets(use_cache=False), 1)
+    results["load_default_datasets.cached"], datasets = time_call(load_default_datasets, repeat)
+
+    for size in sizes:
+        print(f"Benchmarking universe size {size}...")
+        results[f"size_{size}"] = _bench_size(datasets, size, repeat, frontier_points, max_frontier_assets)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the inference engine hot paths.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="Universe sizes, or 'full'.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--frontier-points", type=int, default=20)
+    parser.add_argument("--max-frontier-assets", type=int, default=500)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    config = vars(args).copy()
+    config["output"] = str(args.output) if args.output else None
+    results = run(args.sizes, args.repeat, args.frontier_points, args.max_frontier_assets)
+    path = write_results("engine", results, config, args.output)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
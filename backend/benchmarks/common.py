@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+_INFERENCE_DIR = BACKEND_DIR / "inference-engine"
+if str(_INFERENCE_DIR) not in sys.path:
+    sys.path.append(str(_INFERENCE_DIR))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def summarize_seconds(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def time_call(func: Callable[[], Any], repeat: int = 3) -> tuple[Dict[str, float], Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return summarize_seconds(samples), result
+
+
+def write_results(kind: str, results: Dict[str, Any], config: Dict[str, Any], output: Optional[Path]) -> Path:
+    commit = git_commit()
+    payload = {
+        "benchmark": kind,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+    path = output or RESULTS_DIR / f"{kind}-{commit or 'local'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return path
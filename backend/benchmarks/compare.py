@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Engine results report per-phase medians; API results report latency percentiles.
+_METRICS = ("median", "p50", "p99")
+
+
+def _flatten(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        name = f"{prefix}{key}"
+        metrics = [metric for metric in _METRICS if isinstance(value.get(metric), (int, float))]
+        for metric in metrics:
+            yield f"{name} [{metric}]", float(value[metric])
+        if not metrics:
+            yield from _flatten(value, prefix=f"{name} / ")
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> List[str]:
+    before = dict(_flatten(baseline["results"]))
+    after = dict(_flatten(candidate["results"]))
+
+    regressions = []
+    print(f"{'metric':<70} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        change = (new - old) / old if old > 0 else 0.0
+        flag = " !" if change > threshold else ""
+        print(f"{name:<70} {old:>12.6f} {new:>12.6f} {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown flagged as a regression.")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
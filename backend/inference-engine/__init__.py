@@ -2,17 +2,41 @@
 
 from .models import (
     AssetSelection,
+    EfficientFrontier,
+    LocationSummary,
     MarketArbitrageInputs,
     MarketArbitrageOutputs,
+    PortfolioConstraints,
+    PortfolioSolution,
+    RegionRiskScore,
     RiskAnalysisInputs,
+    RatioBands,
     RiskAnalysisOutputs,
+    SeasonalDecomposition,
+    ValuationPanel,
 )
 from .risk_analysis import RiskAnalysis, risk_analysis
-from .market_arbitrage import MarketArbitrage
+from .market_arbitrage import MarketArbitrage, batched_cross_sectional_valuation, rolling_mean_std
+from .risk_index import RiskReturnIndex
+from .phases import current_rss_bytes, phase, set_phase_listener
+from .decomposition import batched_adfuller, batched_seasonal_decompose, decomposition_strengths
+from .moments import ColumnMoments, RegressionMoments
+from .optimization import compute_efficient_frontier, optimize_portfolios
+from .risk_scoring import RiskScoreTable, build_region_features
+from .clustering import ReturnClusters
+from .peer_index import CorrelationIndex
+from .shared_arrays import SharedArrayStore
+from .city_lookup import CityNameIndex, PrefixIndex, split_city_query
+from .locations import LocationIndex
 from .datasets import (
     DatasetBundle,
+    RegionTimeseries,
+    datasets_fingerprint,
+    files_fingerprint,
     load_city_rent_timeseries,
     load_city_value_timeseries,
+    load_county_rent_timeseries,
+    load_region_rent_timeseries,
     load_us_avg_rent_series,
     load_us_avg_value_series,
     load_default_datasets,
@@ -20,16 +44,51 @@ from .datasets import (
 
 __all__ = [
     "AssetSelection",
+    "CityNameIndex",
+    "ColumnMoments",
+    "CorrelationIndex",
+    "EfficientFrontier",
+    "LocationIndex",
+    "LocationSummary",
     "MarketArbitrage",
     "MarketArbitrageInputs",
     "MarketArbitrageOutputs",
+    "PortfolioConstraints",
+    "PortfolioSolution",
+    "PrefixIndex",
+    "RatioBands",
+    "RegionRiskScore",
+    "RegressionMoments",
+    "ReturnClusters",
     "RiskAnalysis",
     "RiskAnalysisInputs",
     "RiskAnalysisOutputs",
+    "RiskReturnIndex",
+    "RiskScoreTable",
+    "SharedArrayStore",
+    "SeasonalDecomposition",
+    "ValuationPanel",
+    "batched_adfuller",
+    "batched_cross_sectional_valuation",
+    "batched_seasonal_decompose",
+    "build_region_features",
+    "compute_efficient_frontier",
+    "current_rss_bytes",
+    "decomposition_strengths",
+    "optimize_portfolios",
+    "phase",
     "risk_analysis",
+    "rolling_mean_std",
+    "set_phase_listener",
+    "split_city_query",
     "DatasetBundle",
+    "RegionTimeseries",
+    "datasets_fingerprint",
+    "files_fingerprint",
     "load_city_rent_timeseries",
     "load_city_value_timeseries",
+    "load_county_rent_timeseries",
+    "load_region_rent_timeseries",
     "load_us_avg_rent_series",
     "load_us_avg_value_series",
     "load_default_datasets",
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import re
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+_STATE_ABBREVIATIONS = frozenset(US_STATES.values())
+_LABEL = re.compile(r"^(?P<name>.*?)\s*\((?P<state>[^()]*)\)\s*$")
+_SEPARATORS = re.compile(r"[\s,.()]+")
+
+
+def _normalize(text: str) -> str:
+    return _SEPARATORS.sub(" ", text.casefold()).strip()
+
+
+def split_city_query(query: str) -> tuple[str, Optional[str]]:
+    match = _LABEL.match(query)
+    if match:
+        return _normalize(match["name"]), _normalize(match["state"]) or None
+
+    normalized = _normalize(query)
+    # Accept "Austin TX", "Austin, Texas" and "New York New York" as well as "Austin (TX)".
+    for state_name, abbreviation in US_STATES.items():
+        if normalized.endswith(" " + state_name):
+            return normalized[: -len(state_name) - 1].strip(), abbreviation
+    head, _, tail = normalized.rpartition(" ")
+    if head and tail in _STATE_ABBREVIATIONS:
+        return head, tail
+    return normalized, None
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixIndex:
+    def __init__(self, entries: Iterable[tuple[str, int]]) -> None:
+        pairs = sorted(entries)
+        self._keys = [key for key, _ in pairs]
+        self._ids = np.array([record_id for _, record_id in pairs], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def exact(self, key: str) -> list[int]:
+        start = bisect_left(self._keys, key)
+        end = bisect_right(self._keys, key, lo=start)
+        return self._ids[start:end].tolist()
+
+    def prefix(self, prefix: str, limit: int = 10) -> list[int]:
+        matches: list[int] = []
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(matches) < limit and self._keys[position].startswith(prefix):
+            matches.append(int(self._ids[position]))
+            position += 1
+        return matches
+
+
+class CityNameIndex:
+    def __init__(self, labels: Sequence[str]) -> None:
+        # Labels arrive in SizeRank order, so a lower id means a larger market.
+        self.labels = list(labels)
+        self.names: list[str] = []
+        self.states: list[Optional[str]] = []
+        self._by_key: dict[str, int] = {}
+        self._by_name: dict[str, list[int]] = {}
+        self._trigrams: dict[str, list[int]] = {}
+
+        for label_id, label in enumerate(self.labels):
+            name, state = split_city_query(label)
+            self.names.append(name)
+            self.states.append(state)
+            self._by_key.setdefault(f"{name} {state}" if state else name, label_id)
+            self._by_name.setdefault(name, []).append(label_id)
+            for trigram in _trigrams(name):
+                self._trigrams.setdefault(trigram, []).append(label_id)
+
+        self._prefixes = PrefixIndex((name, label_id) for label_id, name in enumerate(self.names))
+
+    def resolve(self, query: str) -> Optional[str]:
+        name, state = split_city_query(query)
+        if state:
+            label_id = self._by_key.get(f"{name} {state}")
+        else:
+            candidates = self._by_name.get(name)
+            label_id = candidates[0] if candidates else None
+        return self.labels[label_id] if label_id is not None else None
+
+    def suggest(self, query: str, limit: int = 10) -> list[str]:
+        name, state = split_city_query(query)
+        if not name:
+            return []
+
+        prefix_ids = sorted(self._prefixes.prefix(name, limit=max(limit * 20, 200)))
+        matches = [label_id for label_id in prefix_ids if state is None or self.states[label_id] == state]
+        if len(matches) < limit:
+            seen = set(matches)
+            matches.extend(
+                label_id
+                for label_id in self._fuzzy(name, limit=limit * 2)
+                if label_id not in seen and (state is None or self.states[label_id] == state)
+            )
+        if not matches and state is not None:
+            # "Austin (CO)" should still offer "Austin (TX)".
+            return self.suggest(name, limit=limit)
+        return [self.labels[label_id] for label_id in matches[:limit]]
+
+    def _fuzzy(self, name: str, limit: int, min_similarity: float = 0.3) -> list[int]:
+        query_trigrams = _trigrams(name)
+        shared = Counter(
+            label_id for trigram in query_trigrams for label_id in self._trigrams.get(trigram, ())
+        )
+        scored = []
+        for label_id, overlap in shared.items():
+            similarity = overlap / (len(query_trigrams) + len(_trigrams(self.names[label_id])) - overlap)
+            if similarity >= min_similarity:
+                scored.append((-similarity, label_id))
+        return [label_id for _, label_id in sorted(scored)[:limit]]
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Iterator, Sequence
+
+import numpy as np
+
+DEFAULT_N_CLUSTERS = 5
+
+
+class ReturnClusters:
+    def __init__(
+        self,
+        names: Sequence[str],
+        unit_returns: np.ndarray,
+        n_components: int = 10,
+        random_state: int = 0,
+        block_size: int = 512,
+    ) -> None:
+        self.names = list(names)
+        # Columns are centered, unit-norm returns, so their dot products are correlations. The array is
+        # kept as passed (typically the shared read-only map) and only copied a block of columns at a time.
+        self.unit_returns = unit_returns
+        if unit_returns.ndim != 2 or unit_returns.shape[1] != len(self.names):
+            raise ValueError("unit_returns must have one column per name")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.random_state = random_state
+        n_periods, n_assets = unit_returns.shape
+
+        def blocks() -> Iterator[tuple[slice, np.ndarray]]:
+            # Columns without a defined correlation (NaN) contribute zero vectors, as before.
+            for start in range(0, n_assets, block_size):
+                columns = slice(start, min(start + block_size, n_assets))
+                yield columns, np.nan_to_num(np.asarray(unit_returns[:, columns], dtype=np.float64))
+
+        # The T x T Gram matrix has the same leading spectrum as a thin SVD of the T x N returns,
+        # costs O(T^2 N) and never forms the N x N correlation matrix.
+        gram = np.zeros((n_periods, n_periods))
+        for _, block in blocks():
+            gram += block @ block.T
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        order = np.argsort(eigenvalues)[::-1][: min(n_periods, n_assets)]
+        variance = np.clip(eigenvalues[order], 0.0, None)
+        rank = max(1, min(n_components, len(order)))
+        self.explained_variance_ratio = variance[:rank] / variance.sum() if variance.sum() > 0 else np.zeros(rank)
+
+        # Projecting the returns on the leading eigenvectors gives each city's coordinates, V * S.
+        basis = eigenvectors[:, order[:rank]]
+        self.embedding = np.empty((n_assets, rank))
+        for columns, block in blocks():
+            self.embedding[columns] = block.T @ basis
+
+        # On unit vectors, squared Euclidean distance is 2 * (1 - correlation).
+        norms = np.linalg.norm(self.embedding, axis=1, keepdims=True)
+        self._directions = np.divide(self.embedding, norms, out=np.zeros_like(self.embedding), where=norms > 0)
+        self._labels: dict[int, np.ndarray] = {}
+
+    def labels(self, n_clusters: int) -> np.ndarray:
+        if n_clusters < 1:
+            raise ValueError("n_clusters must be positive")
+        n_clusters = min(n_clusters, len(self.names))
+        if n_clusters not in self._labels:
+            from sklearn.cluster import MiniBatchKMeans
+
+            model = MiniBatchKMeans(
+                n_clusters=n_clusters,
+                random_state=self.random_state,
+                n_init=3,
+                batch_size=min(1024, len(self.names)),
+            )
+            self._labels[n_clusters] = model.fit_predict(self._directions).astype(np.int32)
+        return self._labels[n_clusters]
+
+    def peers(self, position: int, n_clusters: int, limit: int = 10) -> tuple[int, list[tuple[int, float]]]:
+        labels = self.labels(n_clusters)
+        cluster = int(labels[position])
+        members = np.flatnonzero(labels == cluster)
+        members = members[members != position]
+        # Exact correlations against the cluster members only: O(T * cluster size).
+        correlations = self.unit_returns[:, members].T.astype(np.float64) @ self.unit_returns[:, position]
+        # Members without a defined correlation are not peers.
+        finite = np.isfinite(correlations)
+        members, correlations = members[finite], correlations[finite]
+        order = np.argsort(-correlations, kind="stable")[:limit]
+        return cluster, [(int(members[i]), float(correlations[i])) for i in order]
@@ -1,45 +1,275 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import json
+import os
 from pathlib import Path
+import re
+from typing import Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
+_CACHE_FORMAT_VERSION = 1
+_CACHE_DIR_ENV = "INFERENCE_DATASET_CACHE_DIR"
+_DATE_COLUMN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_CSV_CHUNK_ROWS = 1024
+_DEFAULT_DATASET_FILES = ("US_rental_city.csv", "US_value_city.csv", "US_avg.csv", "US_value_avg.csv")
+VALUE_DATASET_FILES = ("US_value_city.csv", "US_value_avg.csv")
+REGION_DATASET_FILES = ("US_rental.csv", "US_rental_county.csv")
+
 
 @dataclass(frozen=True)
 class DatasetBundle:
     rent_ts: pd.DataFrame
-    value_ts: pd.DataFrame
+    value_ts: Optional[pd.DataFrame]
     us_avg_rent: pd.Series
-    us_avg_value: pd.Series
+    us_avg_value: Optional[pd.Series]
+    fingerprint: str = ""
+
+
+@dataclass(frozen=True)
+class RegionTimeseries:
+    values: pd.DataFrame
+    metadata: pd.DataFrame
 
 
 def _default_dataset_dir() -> Path:
     return Path(__file__).resolve().parents[1] / "datasets"
 
 
-def _load_city_timeseries(csv_path: Path) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+def _default_cache_dir(dataset_dir: Path) -> Path:
+    override = os.environ.get(_CACHE_DIR_ENV)
+    return Path(override) if override else dataset_dir / ".cache"
+
+
+def _file_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return _hash_file(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=64)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def datasets_fingerprint(dataset_dir: Path | None = None) -> str:
+    return files_fingerprint(_DEFAULT_DATASET_FILES, dataset_dir)
+
+
+def files_fingerprint(file_names: Sequence[str], dataset_dir: Path | None = None) -> str:
+    base_dir = dataset_dir or _default_dataset_dir()
+    digest = hashlib.sha256()
+    for name in file_names:
+        # A missing file still counts, so adding it later changes the fingerprint.
+        path = base_dir / name
+        digest.update(f"{name}:{_file_fingerprint(path) if path.exists() else 'missing'};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _cache_paths(cache_dir: Path, csv_path: Path, fingerprint: str) -> tuple[Path, Path]:
+    stem = f"{csv_path.stem}-v{_CACHE_FORMAT_VERSION}-{fingerprint}"
+    return cache_dir / f"{stem}.npy", cache_dir / f"{stem}.json"
+
+
+def _read_cached_timeseries(values_path: Path, meta_path: Path) -> pd.DataFrame | None:
+    if not values_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        meta = json.loads(meta_path.read_text())
+        values = np.load(values_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    index = pd.Index(meta["index"], dtype=object)
+    columns = pd.Index(meta["columns"], dtype=object)
+    if values.shape != (len(index), len(columns)):
+        return None
+
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _write_cached_timeseries(df: pd.DataFrame, values_path: Path, meta_path: Path) -> None:
+    # np.save records the memory order, so the Fortran-ordered matrix is written without a copy.
+    values = df.to_numpy(dtype=np.float64)
+    meta = {"index": [str(label) for label in df.index], "columns": [str(label) for label in df.columns]}
+
+    # Write to temporaries and rename so concurrent workers never see a partial file.
+    values_tmp = values_path.with_name(f"{values_path.name}.{os.getpid()}.tmp")
+    meta_tmp = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+    try:
+        values_path.parent.mkdir(parents=True, exist_ok=True)
+        with values_tmp.open("wb") as handle:
+            np.save(handle, values)
+        meta_tmp.write_text(json.dumps(meta))
+        os.replace(values_tmp, values_path)
+        os.replace(meta_tmp, meta_path)
+    except OSError:
+        values_tmp.unlink(missing_ok=True)
+        meta_tmp.unlink(missing_ok=True)
+
+
+def _load_city_timeseries(csv_path: Path, cache_dir: Path | None = None) -> pd.DataFrame:
+    if cache_dir is None:
+        return _parse_city_timeseries(csv_path)
+
+    values_path, meta_path = _cache_paths(cache_dir, csv_path, _file_fingerprint(csv_path))
+    cached = _read_cached_timeseries(values_path, meta_path)
+    if cached is not None:
+        return cached
+
+    df_ts = _parse_city_timeseries(csv_path)
+    _write_cached_timeseries(df_ts, values_path, meta_path)
+    return df_ts
+
+
+def _parse_city_timeseries(csv_path: Path) -> pd.DataFrame:
+    # The first eight columns are region metadata; every later column is a month.
+    date_columns = _read_header(csv_path)[8:]
+    values, metadata = _stream_wide_csv(csv_path, date_columns, max_missing=10)
+
+    labels = metadata["RegionName"].astype(str) + " (" + metadata["State"].astype(str) + ")"
+    return pd.DataFrame(
+        values,
+        index=pd.Index(date_columns, dtype=object),
+        columns=pd.Index(labels.to_numpy(), dtype=object),
+        copy=False,
+    )
+
+
+def _read_header(csv_path: Path) -> list[str]:
+    return [str(column) for column in pd.read_csv(csv_path, nrows=0).columns]
+
+
+def _count_lines(csv_path: Path) -> int:
+    with open(csv_path, "rb") as handle:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: handle.read(1 << 20), b""))
+
+
+def _stream_wide_csv(
+    csv_path: Path,
+    date_columns: Sequence[str],
+    max_missing: int,
+    skip_region_types: Sequence[str] = (),
+) -> tuple[np.ndarray, pd.DataFrame]:
+    date_set = set(date_columns)
+    metadata_columns = [column for column in _read_header(csv_path) if column not in date_set]
+    dtypes = {**{column: np.float64 for column in date_columns}, **{column: str for column in metadata_columns}}
+
+    # The line count bounds the number of regions. np.empty only commits the pages
+    # that are written, so slots left over for dropped rows cost address space, not memory.
+    capacity = _count_lines(csv_path)
+    values = np.empty((len(date_columns), capacity), dtype=np.float64, order="F")
+    kept_metadata: list[pd.DataFrame] = []
+    n_kept = 0
 
-    df_t = df.T
-    df_ts = df_t.iloc[8:, :]
-    df_ts.columns = df_t.loc["RegionName"].astype(str) + " (" + df["State"].astype(str) + ")"
+    for chunk in pd.read_csv(csv_path, dtype=dtypes, chunksize=_CSV_CHUNK_ROWS):
+        if skip_region_types:
+            chunk = chunk[~chunk["RegionType"].str.lower().isin(skip_region_types)]
 
-    df_ts = df_ts.astype(float)
-    df_ts = df_ts.loc[:, df_ts.isna().sum() <= 10]
-    df_ts_filtered = df_ts.loc[:, df_ts.isna().sum() <= 15]
-    df_ts_filtered = df_ts_filtered.interpolate(method="linear")
-    return df_ts_filtered
+        block = chunk[list(date_columns)].to_numpy(dtype=np.float64)
+        keep = np.isnan(block).sum(axis=1) <= max_missing
+        block = block[keep]
+        _interpolate_rows(block)
+
+        # Each region is one contiguous column of the Fortran-ordered matrix.
+        values[:, n_kept : n_kept + len(block)] = block.T
+        n_kept += len(block)
+        kept_metadata.append(chunk.loc[keep, metadata_columns])
+
+    metadata = (
+        pd.concat(kept_metadata, ignore_index=True) if kept_metadata else pd.DataFrame(columns=metadata_columns)
+    )
+    return values[:, :n_kept], metadata
+
+
+def _interpolate_rows(block: np.ndarray) -> None:
+    # Same result as DataFrame.interpolate(method="linear") on each series: interior gaps
+    # are filled linearly, trailing gaps repeat the last value and leading gaps stay NaN.
+    n_dates = block.shape[1]
+    for row in np.flatnonzero(np.isnan(block).any(axis=1)):
+        series = block[row]
+        observed = np.flatnonzero(~np.isnan(series))
+        if observed.size == 0:
+            continue
+        start = observed[0]
+        series[start:] = np.interp(np.arange(start, n_dates), observed, series[observed])
+
+
+def load_city_rent_timeseries(dataset_dir: Path | None = None, use_cache: bool = True) -> pd.DataFrame:
+    base_dir = dataset_dir or _default_dataset_dir()
+    cache_dir = _default_cache_dir(base_dir) if use_cache else None
+    return _load_city_timeseries(base_dir / "US_rental_city.csv", cache_dir)
+
+
+def load_city_value_timeseries(dataset_dir: Path | None = None, use_cache: bool = True) -> pd.DataFrame:
+    base_dir = dataset_dir or _default_dataset_dir()
+    cache_dir = _default_cache_dir(base_dir) if use_cache else None
+    return _load_city_timeseries(base_dir / "US_value_city.csv", cache_dir)
+
+
+def _region_labels(df: pd.DataFrame) -> pd.Series:
+    region_type = df["RegionType"].astype(str).str.lower()
+    names = df["RegionName"].astype(str)
+    states = (df["State"] if "State" in df.columns else df["StateName"]).fillna("").astype(str)
+
+    labels = names + " (" + states + ")"
+    labels = labels.where(region_type != "zip", names.str.zfill(5))
+    # Metro names already carry their state, e.g. "New York, NY".
+    return labels.where(region_type != "msa", names)
+
+
+def _region_fips(df: pd.DataFrame) -> np.ndarray:
+    if "StateCodeFIPS" not in df.columns or "MunicipalCodeFIPS" not in df.columns:
+        return np.full(len(df), -1, dtype=np.int32)
+
+    state_codes = pd.to_numeric(df["StateCodeFIPS"], errors="coerce")
+    municipal_codes = pd.to_numeric(df["MunicipalCodeFIPS"], errors="coerce")
+    return (state_codes * 1000 + municipal_codes).fillna(-1).to_numpy(dtype=np.int32)
+
+
+def _parse_region_timeseries(csv_path: Path) -> RegionTimeseries:
+    date_columns = [column for column in _read_header(csv_path) if _DATE_COLUMN.match(column)]
+    values, metadata = _stream_wide_csv(csv_path, date_columns, max_missing=10, skip_region_types=("country",))
+
+    labels = _region_labels(metadata)
+    df_ts = pd.DataFrame(
+        values,
+        index=pd.Index(date_columns, dtype=object),
+        columns=pd.Index(labels.to_numpy(), dtype=object),
+        copy=False,
+    )
+
+    region_metadata = pd.DataFrame(
+        {
+            "RegionID": pd.to_numeric(metadata["RegionID"]).to_numpy(dtype=np.int64),
+            "RegionName": metadata["RegionName"].astype(str).to_numpy(),
+            "RegionType": metadata["RegionType"].astype(str).str.lower().to_numpy(),
+            "State": (
+                metadata["State"] if "State" in metadata.columns else metadata["StateName"]
+            ).fillna("").astype(str).to_numpy(),
+            "FIPS": _region_fips(metadata),
+        },
+        index=pd.Index(labels.to_numpy(), dtype=object),
+    )
+    return RegionTimeseries(values=df_ts, metadata=region_metadata)
 
 
-def load_city_rent_timeseries(dataset_dir: Path | None = None) -> pd.DataFrame:
+def load_region_rent_timeseries(dataset_dir: Path | None = None) -> RegionTimeseries:
     base_dir = dataset_dir or _default_dataset_dir()
-    return _load_city_timeseries(base_dir / "US_rental_city.csv")
+    return _parse_region_timeseries(base_dir / "US_rental.csv")
 
 
-def load_city_value_timeseries(dataset_dir: Path | None = None) -> pd.DataFrame:
+def load_county_rent_timeseries(dataset_dir: Path | None = None) -> RegionTimeseries:
     base_dir = dataset_dir or _default_dataset_dir()
-    return _load_city_timeseries(base_dir / "US_value_city.csv")
+    return _parse_region_timeseries(base_dir / "US_rental_county.csv")
 
 
 def _load_us_avg_series(csv_path: Path) -> pd.Series:
@@ -58,11 +288,14 @@ def load_us_avg_value_series(dataset_dir: Path | None = None) -> pd.Series:
     return _load_us_avg_series(base_dir / "US_value_avg.csv")
 
 
-def load_default_datasets(dataset_dir: Path | None = None) -> DatasetBundle:
+def load_default_datasets(dataset_dir: Path | None = None, use_cache: bool = True) -> DatasetBundle:
     base_dir = dataset_dir or _default_dataset_dir()
+    # Home values are optional: without them the bundle is rent-only and value_ts is None.
+    has_values = all((base_dir / name).exists() for name in VALUE_DATASET_FILES)
     return DatasetBundle(
-        rent_ts=load_city_rent_timeseries(base_dir),
-        value_ts=load_city_value_timeseries(base_dir),
+        rent_ts=load_city_rent_timeseries(base_dir, use_cache=use_cache),
+        value_ts=load_city_value_timeseries(base_dir, use_cache=use_cache) if has_values else None,
         us_avg_rent=load_us_avg_rent_series(base_dir),
-        us_avg_value=load_us_avg_value_series(base_dir),
+        us_avg_value=load_us_avg_value_series(base_dir) if has_values else None,
+        fingerprint=datasets_fingerprint(base_dir),
     )
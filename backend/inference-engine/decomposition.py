@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+DECOMPOSITION_MODELS = ("additive", "multiplicative")
+
+
+def _trend_filter(period: int) -> np.ndarray:
+    # Same centered moving average as statsmodels: a 2 x period MA for even periods.
+    if period % 2 == 0:
+        return np.array([0.5] + [1.0] * (period - 1) + [0.5]) / period
+    return np.repeat(1.0 / period, period)
+
+
+def batched_seasonal_decompose(
+    values: np.ndarray,
+    period: int = 12,
+    model: str = "additive",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if model not in DECOMPOSITION_MODELS:
+        raise ValueError(f"model must be one of {DECOMPOSITION_MODELS}, got {model!r}")
+    if period < 2:
+        raise ValueError("period must be at least 2")
+
+    values = np.asarray(values, dtype=np.float64)
+    n_dates = len(values)
+    weights = _trend_filter(period)
+    half = (len(weights) - 1) // 2
+
+    # One shifted multiply-add per filter tap covers every column; NaN spreads to any window that touches it.
+    trend = np.full(values.shape, np.nan)
+    if n_dates >= len(weights):
+        centered = np.zeros((n_dates - 2 * half, values.shape[1]))
+        for offset, weight in enumerate(weights):
+            centered += weight * values[offset : offset + len(centered)]
+        trend[half : n_dates - half] = centered
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        detrended = values - trend if model == "additive" else values / trend
+
+        # Phase i holds rows i, i + period, ...; a series starting later only rotates the phases.
+        phase_rows = np.arange(n_dates) % period
+        valid = ~np.isnan(detrended)
+        sums = np.zeros((period, values.shape[1]))
+        counts = np.zeros((period, values.shape[1]))
+        np.add.at(sums, phase_rows, np.where(valid, detrended, 0.0))
+        np.add.at(counts, phase_rows, valid)
+        phase_means = sums / counts
+
+        if model == "additive":
+            phase_means -= phase_means.mean(axis=0)
+            seasonal = phase_means[phase_rows]
+            resid = detrended - seasonal
+        else:
+            phase_means /= phase_means.mean(axis=0)
+            seasonal = phase_means[phase_rows]
+            resid = detrended / seasonal
+
+    # The seasonal pattern only exists where the series itself does.
+    seasonal = np.where(np.isnan(values), np.nan, seasonal)
+    return trend, seasonal, resid
+
+
+def _nan_std(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, values, 0.0).sum(axis=0) / counts
+        centered = np.where(valid, values - mean, 0.0)
+        return np.sqrt((centered**2).sum(axis=0) / (counts - 1))
+
+
+def decomposition_strengths(
+    values: np.ndarray,
+    trend: np.ndarray,
+    seasonal: np.ndarray,
+    resid: np.ndarray,
+) -> dict[str, np.ndarray]:
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        level = np.nanmean(values, axis=0) if len(values) else np.full(values.shape[1], np.nan)
+        resid_var = _nan_std(resid) ** 2
+        # Hyndman & Athanasopoulos strengths: 0 means no trend/seasonality, 1 means the component dominates.
+        trend_f = np.clip(1.0 - resid_var / _nan_std(trend + resid) ** 2, 0.0, 1.0)
+        seasonal_f = np.clip(1.0 - resid_var / _nan_std(seasonal + resid) ** 2, 0.0, 1.0)
+        return {
+            "Trend_Strength": _nan_std(trend) / level,
+            "Seasonal_Strength": _nan_std(seasonal) / level,
+            "Trend_F": trend_f,
+            "Seasonal_F": seasonal_f,
+        }
+
+
+def _default_maxlag(n_obs: int) -> int:
+    # statsmodels' Schwert rule, capped so the regression keeps enough degrees of freedom.
+    return min(n_obs // 2 - 2, int(np.ceil(12.0 * np.power(n_obs / 100.0, 1 / 4.0))))
+
+
+def _adf_design(series: np.ndarray, lags: int, n_rows: int) -> tuple[np.ndarray, np.ndarray]:
+    # series: (n_series, n_obs). Columns are [constant, lagged level, lagged differences 1..lags],
+    # over the last n_rows usable observations.
+    diffs = np.diff(series, axis=1)
+    n_diffs = diffs.shape[1]
+    columns = [np.ones((len(series), n_rows)), series[:, n_diffs - n_rows : n_diffs]]
+    for lag in range(1, lags + 1):
+        columns.append(diffs[:, n_diffs - n_rows - lag : n_diffs - lag])
+    return np.stack(columns, axis=2), diffs[:, n_diffs - n_rows :]
+
+
+def _normal_equations(design: np.ndarray, target: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    transposed = design.transpose(0, 2, 1)
+    return transposed @ design, (transposed @ target[:, :, None])[:, :, 0], (target**2).sum(axis=1)
+
+
+def _solve(gram: np.ndarray, moment: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    try:
+        inverse = np.linalg.inv(gram)
+    except np.linalg.LinAlgError:
+        # A flat series makes its level column collinear with the constant.
+        inverse = np.linalg.pinv(gram)
+    return (inverse @ moment[:, :, None])[:, :, 0], inverse
+
+
+def _adf_group(series: np.ndarray, maxlag: Optional[int]) -> tuple[np.ndarray, np.ndarray]:
+    n_obs = series.shape[1]
+    max_lags = _default_maxlag(n_obs) if maxlag is None else min(maxlag, _default_maxlag(n_obs))
+    stats = np.full(len(series), np.nan)
+    used = np.full(len(series), -1)
+    if max_lags < 0:
+        return stats, used
+
+    # Lag selection by AIC on a common sample, as adfuller(autolag="AIC") does. The candidate
+    # regressions are nested, so each one solves a leading block of the same normal equations.
+    n_rows = n_obs - 1 - max_lags
+    gram, moment, total = _normal_equations(*_adf_design(series, max_lags, n_rows))
+    best_aic = np.full(len(series), np.inf)
+    for lags in range(max_lags + 1):
+        size = lags + 2
+        coefficients, _ = _solve(gram[:, :size, :size], moment[:, :size])
+        ssr = total - (coefficients * moment[:, :size]).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            aic = n_rows * np.log(ssr / n_rows) + 2 * size
+        better = aic < best_aic
+        best_aic[better] = aic[better]
+        used[better] = lags
+
+    # Refit each chosen lag on its full available sample and read the t-statistic of the lagged level.
+    for lags in np.unique(used[used >= 0]):
+        members = np.flatnonzero(used == lags)
+        rows = n_obs - 1 - lags
+        gram, moment, total = _normal_equations(*_adf_design(series[members], int(lags), rows))
+        coefficients, inverse = _solve(gram, moment)
+        ssr = total - (coefficients * moment).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sigma2 = ssr / (rows - gram.shape[2])
+            stats[members] = coefficients[:, 1] / np.sqrt(sigma2 * inverse[:, 1, 1])
+    return stats, used
+
+
+def batched_adfuller(
+    values: np.ndarray,
+    maxlag: Optional[int] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    from statsmodels.tsa.adfvalues import mackinnonp
+
+    values = np.asarray(values, dtype=np.float64)
+    n_series = values.shape[1]
+    stats = np.full(n_series, np.nan)
+    pvalues = np.full(n_series, np.nan)
+    used_lags = np.full(n_series, -1)
+
+    # Series are tested from their first observation. Series that start on the same row share a
+    # length, so each such group is solved as one stack of small regressions.
+    observed = ~np.isnan(values)
+    starts = np.where(observed.any(axis=0), observed.argmax(axis=0), len(values))
+    for start in np.unique(starts):
+        members = np.flatnonzero(starts == start)
+        block = values[start:, members].T
+        complete = ~np.isnan(block).any(axis=1)
+        members, block = members[complete], block[complete]
+        if len(members) == 0 or block.shape[1] < 8:
+            continue
+        stats[members], used_lags[members] = _adf_group(block, maxlag)
+
+    for position in np.flatnonzero(~np.isnan(stats)):
+        pvalues[position] = mackinnonp(stats[position], regression="c", N=1)
+    return stats, pvalues, used_lags
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from city_lookup import PrefixIndex
+from datasets import RegionTimeseries
+from models import LocationSummary
+from risk_analysis import RiskAnalysis
+from risk_scoring import RiskScoreTable, build_region_features
+
+LOCATION_LEVELS = {"zip": "zip", "msa": "metro", "county": "county"}
+CODE_TYPES = ("zip", "fips", "region_id")
+# The code a numeric query is matched against when the caller only restricts levels.
+_LEVEL_CODE_TYPES = {"zip": "zip", "county": "fips", "metro": "region_id"}
+
+
+@dataclass(frozen=True)
+class _Level:
+    analysis: RiskAnalysis
+    risk_scores: RiskScoreTable
+    latest: np.ndarray
+    annual_change: np.ndarray
+
+
+class LocationIndex:
+    def __init__(self, sources: Sequence[RegionTimeseries], us_avg: pd.Series) -> None:
+        self.labels: list[str] = []
+        self.states: list[str] = []
+        level_codes: list[str] = []
+        region_ids: list[int] = []
+        fips_codes: list[int] = []
+        positions: list[int] = []
+        self._levels: dict[str, _Level] = {}
+
+        for level, values, metadata in _split_levels(sources):
+            self._levels[level] = _build_level(values, us_avg)
+            for position, (label, row) in enumerate(metadata.iterrows()):
+                self.labels.append(label)
+                self.states.append(row["State"])
+                level_codes.append(level)
+                region_ids.append(int(row["RegionID"]))
+                fips_codes.append(int(row["FIPS"]))
+                positions.append(position)
+
+        self.levels = np.array(level_codes, dtype=object)
+        self.region_ids = np.array(region_ids, dtype=np.int64)
+        self.fips = np.array(fips_codes, dtype=np.int32)
+        self.positions = np.array(positions, dtype=np.int32)
+
+        self._by_region_id = {region_id: record_id for record_id, region_id in enumerate(region_ids)}
+        # One table per code type: a ZIP and a county FIPS code can share the same five digits.
+        self._codes = {
+            "zip": PrefixIndex(
+                (label, record_id) for record_id, label in enumerate(self.labels) if self.levels[record_id] == "zip"
+            ),
+            "fips": PrefixIndex(
+                (f"{int(fips):05d}", record_id)
+                for record_id, fips in enumerate(self.fips)
+                if self.levels[record_id] != "zip" and fips >= 0
+            ),
+        }
+        self._names = PrefixIndex((label.casefold(), record_id) for record_id, label in enumerate(self.labels))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def resolve(
+        self,
+        query: str,
+        levels: Optional[Sequence[str]] = None,
+        code_type: Optional[str] = None,
+    ) -> Optional[int]:
+        if code_type is not None and code_type not in CODE_TYPES:
+            raise ValueError(f"code_type must be one of {CODE_TYPES}, got {code_type!r}")
+
+        query = query.strip()
+        code = query.split("-", 1)[0]
+        if code.isdigit():
+            candidates = [
+                record_id for kind in _code_types(code, levels, code_type) for record_id in self._by_code(kind, code)
+            ]
+        elif code_type is None:
+            candidates = self._names.exact(query.casefold())
+        else:
+            return None
+
+        for record_id in candidates:
+            if levels is None or self.levels[record_id] in levels:
+                return record_id
+        return None
+
+    def _by_code(self, code_type: str, code: str) -> list[int]:
+        if code_type == "region_id":
+            record_id = self._by_region_id.get(int(code))
+            return [] if record_id is None else [record_id]
+        return self._codes[code_type].exact(code.zfill(5)) if len(code) <= 5 else []
+
+    def summary(self, record_id: int) -> LocationSummary:
+        level = self._levels[self.levels[record_id]]
+        position = int(self.positions[record_id])
+        fips = int(self.fips[record_id])
+        return LocationSummary(
+            label=self.labels[record_id],
+            level=str(self.levels[record_id]),
+            region_id=int(self.region_ids[record_id]),
+            fips=fips if fips >= 0 else None,
+            state=self.states[record_id],
+            latest_rent=float(level.latest[position]),
+            annual_change=float(level.annual_change[position]),
+            volatility=float(level.analysis.asset_volatilities.iloc[position]),
+            beta=float(level.analysis.alpha_beta["Beta"].iloc[position]),
+            risk=level.risk_scores.lookup(self.labels[record_id]),
+        )
+
+
+def _split_levels(sources: Sequence[RegionTimeseries]) -> Iterable[tuple[str, pd.DataFrame, pd.DataFrame]]:
+    parts: dict[str, list[tuple[pd.DataFrame, pd.DataFrame]]] = {}
+    for source in sources:
+        for region_type, level in LOCATION_LEVELS.items():
+            selected = (source.metadata["RegionType"] == region_type).to_numpy()
+            if selected.any():
+                parts.setdefault(level, []).append((source.values.loc[:, selected], source.metadata.loc[selected]))
+
+    # Positions index into one frame per level, so sources sharing a level are concatenated.
+    for level, frames in parts.items():
+        values = pd.concat([frame for frame, _ in frames], axis=1)
+        metadata = pd.concat([frame for _, frame in frames])
+        unique = ~metadata.index.duplicated(keep="first")
+        yield level, values.loc[:, unique], metadata.loc[unique]
+
+
+def _build_level(values: pd.DataFrame, us_avg: pd.Series) -> _Level:
+    analysis = RiskAnalysis(
+        df=values,
+        asset_names_or_number=list(values.columns),
+        us_avg=us_avg,
+        risk_free_rate=0.0,
+    )
+    latest = values.iloc[-1].to_numpy(dtype=np.float64)
+    annual_change = np.full_like(latest, np.nan)
+    if len(values) > 12:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            annual_change = latest / values.iloc[-13].to_numpy(dtype=np.float64) - 1.0
+
+    return _Level(
+        analysis=analysis,
+        risk_scores=RiskScoreTable(build_region_features(analysis)),
+        latest=latest,
+        annual_change=annual_change,
+    )
+
+
+def _code_types(code: str, levels: Optional[Sequence[str]], code_type: Optional[str]) -> tuple[str, ...]:
+    if code_type is not None:
+        return (code_type,)
+    if levels is not None:
+        return tuple(dict.fromkeys(_LEVEL_CODE_TYPES[level] for level in levels))
+    # Without a hint, a ZIP-shaped query is only ever a ZIP; longer numbers are Zillow RegionIDs.
+    return ("zip",) if len(code) <= 5 else ("region_id",)
@@ -1,14 +1,88 @@
 from __future__ import annotations
 
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+import re
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
 
-from models import MarketArbitrageOutputs
+from models import MarketArbitrageOutputs, RatioBands, ValuationPanel
+from phases import phase
 from risk_analysis import RiskAnalysis
 
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+_MAX_CACHED_BANDS = 4
+_VALUATION_DATE = re.compile(r"\d{4}-\d{2}(-\d{2})?")
+
+
+def batched_cross_sectional_valuation(
+    prices: np.ndarray,
+    rents: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    prices = np.asarray(prices, dtype=np.float64)
+    rents = np.asarray(rents, dtype=np.float64)
+
+    # One price-on-rent OLS per date (row), solved in closed form for all dates at once.
+    valid = ~np.isnan(prices) & ~np.isnan(rents)
+    counts = valid.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rent_mean = np.where(valid, rents, 0.0).sum(axis=1) / counts
+        price_mean = np.where(valid, prices, 0.0).sum(axis=1) / counts
+        rent_centered = np.where(valid, rents - rent_mean[:, None], 0.0)
+        price_centered = np.where(valid, prices - price_mean[:, None], 0.0)
+
+        slopes = (rent_centered * price_centered).sum(axis=1) / (rent_centered**2).sum(axis=1)
+        intercepts = price_mean - slopes * rent_mean
+        predicted = np.where(valid, intercepts[:, None] + slopes[:, None] * rents, np.nan)
+
+        mispricing = np.where(valid, prices - predicted, 0.0)
+        mispricing_mean = mispricing.sum(axis=1) / counts
+        mispricing_centered = np.where(valid, mispricing - mispricing_mean[:, None], 0.0)
+        mispricing_std = np.sqrt((mispricing_centered**2).sum(axis=1) / (counts - 1))
+        z_scores = np.where(valid, mispricing_centered / mispricing_std[:, None], np.nan)
+
+    insufficient = counts < 3
+    slopes[insufficient] = np.nan
+    intercepts[insufficient] = np.nan
+    z_scores[insufficient] = np.nan
+    return slopes, intercepts, predicted, z_scores
+
+
+def rolling_mean_std(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+    if window < 2 or window > len(values):
+        return mean, std
+
+    valid = ~np.isnan(values)
+
+    # Shift each column by its mean so the cumulative sums stay small and the variance keeps its precision.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        reference = np.where(valid, values, 0.0).sum(axis=0) / valid.sum(axis=0)
+    shifted = np.where(valid, values - np.nan_to_num(reference), 0.0)
+
+    def window_sums(x: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+        return cumulative[window:] - cumulative[:-window]
+
+    # Like pandas' rolling with min_periods=window, any gap inside the window gives NaN.
+    full = window_sums(valid.astype(np.float64)) == window
+    sums = window_sums(shifted)
+    squares = window_sums(shifted**2)
+    variance = np.maximum(squares - sums**2 / window, 0.0) / (window - 1)
+
+    mean[window - 1 :] = np.where(full, sums / window + reference, np.nan)
+    std[window - 1 :] = np.where(full, np.sqrt(variance), np.nan)
+    return mean, std
+
 
 class MarketArbitrage:
     def __init__(self, rent_obj: RiskAnalysis, price_obj: RiskAnalysis) -> None:
@@ -22,14 +96,24 @@ class MarketArbitrage:
 
         self.price_rent_corr = self.prices_returns.corrwith(self.rents_returns)
         self.latest_valuation: pd.DataFrame | None = None
+        self.valuation_panel: ValuationPanel | None = None
+        self._panel_positions: dict[str, int] | None = None
+        self._ratio: np.ndarray | None = None
+        # Rolling statistics per window; n_std is applied at query time, so it never splits the cache.
+        self._ratio_stats: OrderedDict[int | None, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._ratio_lock = threading.Lock()
 
     def to_outputs(self) -> MarketArbitrageOutputs:
         return MarketArbitrageOutputs(
             price_rent_corr=self.price_rent_corr,
             latest_valuation=self.latest_valuation,
+            valuation_panel=self.valuation_panel,
         )
 
     def plot_correlation_rent_value(self) -> plt.Figure:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         correlations = self.price_rent_corr.sort_values()
 
         fig = plt.figure(figsize=(10, max(6, len(correlations) * 0.25)))
@@ -44,25 +128,91 @@ class MarketArbitrage:
         plt.show()
         return fig
 
-    def plot_cross_sectional_valuation(self, date_index: int = -1) -> pd.DataFrame:
-        latest_prices = self.prices.iloc[date_index]
-        latest_rents = self.rents.iloc[date_index]
-
-        latest_prices = latest_prices[~latest_prices.index.duplicated(keep="first")]
-        latest_rents = latest_rents[~latest_rents.index.duplicated(keep="first")]
-
-        df = pd.DataFrame({"Price": latest_prices, "Rent": latest_rents}).dropna()
+    def compute_valuation_panel(self) -> ValuationPanel:
+        if self.valuation_panel is None:
+            with phase("market_arbitrage.valuation_panel"):
+                prices = self.prices.loc[:, ~self.prices.columns.duplicated(keep="first")]
+                rents = self.rents.loc[:, ~self.rents.columns.duplicated(keep="first")]
+                cities = prices.columns.intersection(rents.columns, sort=False)
+                dates = prices.index.intersection(rents.index, sort=False)
+
+                price_values = prices.loc[dates, cities].to_numpy(dtype=np.float64)
+                rent_values = rents.loc[dates, cities].to_numpy(dtype=np.float64)
+                slopes, intercepts, predicted, z_scores = batched_cross_sectional_valuation(price_values, rent_values)
+
+                self.valuation_panel = ValuationPanel(
+                    dates=[str(date) for date in dates],
+                    cities=list(cities),
+                    prices=price_values,
+                    rents=rent_values,
+                    predicted_prices=predicted,
+                    z_scores=z_scores,
+                    slopes=slopes,
+                    intercepts=intercepts,
+                )
+                self._panel_positions = {city: position for position, city in enumerate(cities)}
+        return self.valuation_panel
+
+    def valuation_date_position(self, date: str | None = None) -> int:
+        panel = self.compute_valuation_panel()
+        if date is None:
+            return len(panel.dates) - 1
+        if not _VALUATION_DATE.fullmatch(date):
+            raise ValueError(f"date must be YYYY-MM or YYYY-MM-DD, got {date!r}")
+        try:
+            datetime.strptime(date, "%Y-%m-%d" if len(date) > 7 else "%Y-%m")
+        except ValueError as exc:
+            raise ValueError(f"Invalid date {date!r}") from exc
+        # Compared at the requested precision, so the last panel month itself is still in range.
+        if date > panel.dates[-1][: len(date)]:
+            raise ValueError(f"No valuation after {panel.dates[-1]}")
+        # "~" sorts after digits, so "2020-06" selects the last date within June 2020.
+        position = bisect_right(panel.dates, date + "~") - 1
+        if position < 0:
+            raise ValueError(f"No valuation on or before {date}")
+        return position
+
+    def compute_cross_sectional_valuation(self, date_index: int = -1) -> pd.DataFrame:
+        panel = self.compute_valuation_panel()
+        row = range(len(panel.dates))[date_index]
+
+        prices = panel.prices[row]
+        rents = panel.rents[row]
+        valid = ~np.isnan(prices) & ~np.isnan(rents)
+        predicted = panel.predicted_prices[row, valid]
+
+        df = pd.DataFrame(
+            {
+                "Price": prices[valid],
+                "Rent": rents[valid],
+                "Predicted_Price": predicted,
+                "Mispricing": prices[valid] - predicted,
+                "Z_Score": panel.z_scores[row, valid],
+            },
+            index=pd.Index(np.asarray(panel.cities, dtype=object)[valid]),
+        )
+        return df
 
-        X = df[["Rent"]]
-        y = df["Price"]
+    def opportunities_at(self, date_index: int = -1, correlation_threshold: float | None = None) -> pd.DataFrame:
+        opportunities = self.compute_cross_sectional_valuation(date_index=date_index).assign(
+            Correlation=self.price_rent_corr
+        )
+        if correlation_threshold is not None:
+            opportunities = opportunities[opportunities["Correlation"] > correlation_threshold]
+        return opportunities.sort_values("Z_Score")
 
-        model = LinearRegression()
-        model.fit(X, y)
+    def mispricing_history(self, city_name: str) -> pd.Series:
+        panel = self.compute_valuation_panel()
+        resolved = self.rent_obj.resolve_asset_name(city_name)
+        if resolved is None or resolved not in self._panel_positions:
+            raise ValueError(f"City not found: {city_name}")
+        return pd.Series(panel.z_scores[:, self._panel_positions[resolved]], index=panel.dates, name=resolved)
 
-        df["Predicted_Price"] = model.predict(X)
-        df["Mispricing"] = df["Price"] - df["Predicted_Price"]
-        df["Z_Score"] = (df["Mispricing"] - df["Mispricing"].mean()) / df["Mispricing"].std()
+    def plot_cross_sectional_valuation(self, date_index: int = -1) -> pd.DataFrame:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
+        df = self.compute_cross_sectional_valuation(date_index=date_index)
         self.latest_valuation = df
 
         df_sorted = df.sort_values("Z_Score")
@@ -86,41 +236,137 @@ class MarketArbitrage:
 
         return df
 
-    def analyze_historical_fair_value(self, city_name: str, window: int | None = None) -> None:
-        if city_name not in self.prices.columns or city_name not in self.rents.columns:
-            print(f"Error: {city_name} not found.")
-            return
+    def ratio_statistics(self, window: int | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        window = window or None
+        with self._ratio_lock:
+            if self._ratio is None:
+                panel = self.compute_valuation_panel()
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    self._ratio = panel.prices / panel.rents
+            ratio = self._ratio
+
+            stats = self._ratio_stats.get(window)
+            if stats is None:
+                with phase("market_arbitrage.ratio_bands"):
+                    if window:
+                        stats = rolling_mean_std(ratio, window)
+                    else:
+                        # Whole-history mean and standard deviation, the same for every date.
+                        valid = ~np.isnan(ratio)
+                        counts = valid.sum(axis=0)
+                        with np.errstate(invalid="ignore", divide="ignore"):
+                            column_mean = np.where(valid, ratio, 0.0).sum(axis=0) / counts
+                            centered = np.where(valid, ratio - column_mean, 0.0)
+                            column_std = np.sqrt((centered**2).sum(axis=0) / (counts - 1))
+                        stats = np.where(valid, column_mean, np.nan), np.where(valid, column_std, np.nan)
+                self._ratio_stats[window] = stats
+                # Each entry holds two date x city matrices, so only a few windows are kept.
+                while len(self._ratio_stats) > _MAX_CACHED_BANDS:
+                    self._ratio_stats.popitem(last=False)
+            else:
+                self._ratio_stats.move_to_end(window)
+        return ratio, *stats
+
+    def compute_ratio_bands(self, window: int | None = None, n_std: float = 2.0) -> RatioBands:
+        panel = self.compute_valuation_panel()
+        ratio, mean, std = self.ratio_statistics(window)
+        return RatioBands(
+            dates=panel.dates,
+            cities=panel.cities,
+            window=window or None,
+            n_std=n_std,
+            ratio=ratio,
+            mean=mean,
+            upper=mean + n_std * std,
+            lower=mean - n_std * std,
+        )
 
-        ts_price = self.prices[city_name]
-        ts_rent = self.rents[city_name]
+    def band_breaches(
+        self,
+        window: int | None = 24,
+        n_std: float = 2.0,
+        date_index: int = -1,
+    ) -> pd.DataFrame:
+        panel = self.compute_valuation_panel()
+        ratios, means, stds = self.ratio_statistics(window)
+        row = range(len(panel.dates))[date_index]
+
+        # Bands are only materialised for the two rows compared.
+        def breaches(at: int) -> tuple[np.ndarray, np.ndarray]:
+            upper = means[at] + n_std * stds[at]
+            lower = means[at] - n_std * stds[at]
+            return ratios[at] > upper, ratios[at] < lower
+
+        ratio, mean, std = ratios[row], means[row], stds[row]
+        above, below = breaches(row)
+        breached = above | below
+
+        if row > 0:
+            was_breached = np.logical_or(*breaches(row - 1))
+        else:
+            was_breached = np.zeros_like(breached)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            deviation = (ratio - mean) / std
+
+        df = pd.DataFrame(
+            {
+                "Ratio": ratio[breached],
+                "Mean": mean[breached],
+                "Upper": mean[breached] + n_std * std[breached],
+                "Lower": mean[breached] - n_std * std[breached],
+                "Deviation": deviation[breached],
+                "Direction": np.where(above[breached], "above", "below"),
+                "New": ~was_breached[breached],
+            },
+            index=pd.Index(np.asarray(panel.cities, dtype=object)[breached]),
+        )
+        return df.reindex(df["Deviation"].abs().sort_values(ascending=False).index)
+
+    def compute_historical_fair_value(self, city_name: str, window: int | None = None, n_std: float = 2.0) -> pd.DataFrame:
+        resolved = self.rent_obj.resolve_asset_name(city_name)
+        panel = self.compute_valuation_panel()
+        if resolved is None or resolved not in self._panel_positions:
+            raise ValueError(f"City not found: {city_name}")
+
+        position = self._panel_positions[resolved]
+        ratio, mean, std = (values[:, position] for values in self.ratio_statistics(window))
+        df = pd.DataFrame(
+            {
+                "Price": panel.prices[:, position],
+                "Rent": panel.rents[:, position],
+                "Ratio": ratio,
+                "Mean": mean,
+                "Upper": mean + n_std * std,
+                "Lower": mean - n_std * std,
+            },
+            index=pd.to_datetime(pd.Index(panel.dates)),
+        )
+        return df.dropna(subset=["Price", "Rent"])
 
-        df = pd.concat([ts_price, ts_rent], axis=1).dropna()
-        df.columns = ["Price", "Rent"]
-        df["Ratio"] = df["Price"] / df["Rent"]
+    def analyze_historical_fair_value(self, city_name: str, window: int | None = None) -> None:
+        import matplotlib.dates as mdates
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-        if window:
-            mean_ratio = df["Ratio"].rolling(window=window).mean()
-            std_ratio = df["Ratio"].rolling(window=window).std()
-            label_txt = f"{window}-Month Moving Avg"
-        else:
-            mean_ratio = df["Ratio"].mean()
-            std_ratio = df["Ratio"].std()
-            label_txt = "Historical Mean"
+        try:
+            df = self.compute_historical_fair_value(city_name, window=window)
+        except ValueError:
+            print(f"Error: {city_name} not found.")
+            return
 
-        upper = mean_ratio + (2 * std_ratio)
-        lower = mean_ratio - (2 * std_ratio)
+        label_txt = f"{window}-Month Moving Avg" if window else "Historical Mean"
 
         plt.figure(figsize=(12, 6))
-        df.index = pd.to_datetime(df.index)
 
         plt.plot(df.index, df["Ratio"], label="Price/Rent Ratio", color="#1f77b4")
 
         if window:
-            plt.plot(df.index, mean_ratio, color="black", linestyle="--", label=label_txt)
-            plt.fill_between(df.index, lower, upper, color="gray", alpha=0.1)
+            plt.plot(df.index, df["Mean"], color="black", linestyle="--", label=label_txt)
+            plt.fill_between(df.index, df["Lower"], df["Upper"], color="gray", alpha=0.1)
         else:
-            plt.axhline(mean_ratio, color="black", linestyle="--", label=label_txt)
-            plt.axhspan(lower, upper, color="gray", alpha=0.1)
+            plt.axhline(df["Mean"].iloc[0], color="black", linestyle="--", label=label_txt)
+            plt.axhspan(df["Lower"].iloc[0], df["Upper"].iloc[0], color="gray", alpha=0.1)
 
         ax = plt.gca()
         ax.xaxis.set_major_locator(mdates.YearLocator())
@@ -131,15 +377,8 @@ class MarketArbitrage:
         sns.despine()
         plt.show()
 
-    def scan_for_opportunities(self, correlation_threshold: float = 0.5) -> pd.DataFrame:
-        if self.latest_valuation is None:
-            print("Running valuation model first...")
-            self.plot_cross_sectional_valuation()
-
-        opportunities = self.latest_valuation.copy()
-        opportunities["Correlation"] = self.price_rent_corr
-
-        valid_opps = opportunities[opportunities["Correlation"] > correlation_threshold].sort_values("Z_Score")
+    def scan_for_opportunities(self, correlation_threshold: float = 0.5, date_index: int = -1) -> pd.DataFrame:
+        valid_opps = self.opportunities_at(date_index=date_index, correlation_threshold=correlation_threshold)
 
         print(f"--- Top Opportunities (Corr > {correlation_threshold}) ---")
         print(valid_opps[["Z_Score", "Correlation", "Price", "Rent"]].head())
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Sequence, Union, TYPE_CHECKING
+from typing import List, Optional, Sequence, Union, TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
 
 AssetSelection = Union[Sequence[str], int]
@@ -14,6 +15,8 @@ class RiskAnalysisInputs:
     asset_names_or_number: AssetSelection
     us_avg: pd.Series
     risk_free_rate: float
+    capm_method: str = "vectorized"
+    matrix_dtype: str = "float64"
 
 
 @dataclass
@@ -26,6 +29,95 @@ class RiskAnalysisOutputs:
     expected_returns: pd.Series
 
 
+@dataclass
+class EfficientFrontier:
+    asset_names: List[str]
+    target_returns: np.ndarray
+    returns: np.ndarray
+    volatilities: np.ndarray
+    weights: np.ndarray
+
+
+@dataclass(frozen=True)
+class PortfolioConstraints:
+    max_weight: float = 1.0
+    target_return: Optional[float] = None
+    target_volatility: Optional[float] = None
+
+
+@dataclass
+class PortfolioSolution:
+    weights: np.ndarray
+    expected_return: float
+    volatility: float
+    success: bool
+    message: str = ""
+
+
+@dataclass(frozen=True)
+class ValuationPanel:
+    dates: List[str]
+    cities: List[str]
+    prices: np.ndarray
+    rents: np.ndarray
+    predicted_prices: np.ndarray
+    z_scores: np.ndarray
+    slopes: np.ndarray
+    intercepts: np.ndarray
+
+
+@dataclass(frozen=True)
+class RatioBands:
+    dates: List[str]
+    cities: List[str]
+    window: Optional[int]
+    n_std: float
+    ratio: np.ndarray
+    mean: np.ndarray
+    upper: np.ndarray
+    lower: np.ndarray
+
+
+@dataclass(frozen=True)
+class SeasonalDecomposition:
+    dates: List[str]
+    cities: List[str]
+    period: int
+    model: str
+    trend: np.ndarray
+    seasonal: np.ndarray
+    resid: np.ndarray
+    features: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class RegionRiskScore:
+    region: str
+    risk_score: int
+    volatility_score: Optional[int]
+    beta_score: Optional[int]
+    seasonality_score: Optional[int]
+    valuation_score: Optional[int]
+    volatility: float
+    beta: float
+    seasonal_strength: float
+    mispricing_z: float
+
+
+@dataclass(frozen=True)
+class LocationSummary:
+    label: str
+    level: str
+    region_id: int
+    fips: Optional[int]
+    state: str
+    latest_rent: float
+    annual_change: float
+    volatility: float
+    beta: float
+    risk: Optional[RegionRiskScore]
+
+
 if TYPE_CHECKING:
     from .risk_analysis import RiskAnalysis
 
@@ -40,3 +132,4 @@ class MarketArbitrageInputs:
 class MarketArbitrageOutputs:
     price_rent_corr: pd.Series
     latest_valuation: Optional[pd.DataFrame] = None
+    valuation_panel: Optional[ValuationPanel] = None
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ColumnMoments:
+    count: int
+    mean: np.ndarray
+    m2: np.ndarray
+    comoment: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, with_comoment: bool = False) -> "ColumnMoments":
+        values = np.asarray(values, dtype=np.float64)
+        mean = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+        centered = values - mean
+        return cls(
+            count=len(values),
+            mean=mean,
+            m2=(centered**2).sum(axis=0),
+            comoment=centered.T @ centered if with_comoment else None,
+        )
+
+    def merge(self, other: "ColumnMoments") -> "ColumnMoments":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+
+        # Chan et al. pairwise update: exact, and stable for long histories.
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        weight = self.count * other.count / count
+        comoment = None
+        if self.comoment is not None and other.comoment is not None:
+            comoment = self.comoment + other.comoment + np.outer(delta, delta) * weight
+        return ColumnMoments(
+            count=count,
+            mean=self.mean + delta * other.count / count,
+            m2=self.m2 + other.m2 + delta**2 * weight,
+            comoment=comoment,
+        )
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.m2 / (self.count - ddof))
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        if self.comoment is None:
+            raise ValueError("Co-moments were not tracked for these columns")
+        return self.comoment / max(self.count - ddof, 1)
+
+
+@dataclass(frozen=True)
+class RegressionMoments:
+    count: np.ndarray
+    x_mean: np.ndarray
+    y_mean: np.ndarray
+    x_m2: np.ndarray
+    xy_comoment: np.ndarray
+
+    @classmethod
+    def from_values(cls, returns: np.ndarray, market: np.ndarray) -> "RegressionMoments":
+        returns = np.asarray(returns, dtype=np.float64)
+        market = np.asarray(market, dtype=np.float64)
+
+        valid = ~np.isnan(returns) & ~np.isnan(market)[:, None]
+        count = valid.sum(axis=0)
+        x = np.where(valid, market[:, None], 0.0)
+        y = np.where(valid, returns, 0.0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.where(count > 0, x.sum(axis=0) / count, 0.0)
+            y_mean = np.where(count > 0, y.sum(axis=0) / count, 0.0)
+        x_centered = np.where(valid, x - x_mean, 0.0)
+        y_centered = np.where(valid, y - y_mean, 0.0)
+        return cls(
+            count=count,
+            x_mean=x_mean,
+            y_mean=y_mean,
+            x_m2=(x_centered**2).sum(axis=0),
+            xy_comoment=(x_centered * y_centered).sum(axis=0),
+        )
+
+    def merge(self, other: "RegressionMoments") -> "RegressionMoments":
+        count = self.count + other.count
+        safe_count = np.maximum(count, 1)
+        x_delta = other.x_mean - self.x_mean
+        y_delta = other.y_mean - self.y_mean
+        weight = self.count * other.count / safe_count
+        return RegressionMoments(
+            count=count,
+            x_mean=self.x_mean + x_delta * other.count / safe_count,
+            y_mean=self.y_mean + y_delta * other.count / safe_count,
+            x_m2=self.x_m2 + other.x_m2 + x_delta**2 * weight,
+            xy_comoment=self.xy_comoment + other.xy_comoment + x_delta * y_delta * weight,
+        )
+
+    def alpha_beta(self) -> tuple[np.ndarray, np.ndarray]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = self.xy_comoment / self.x_m2
+            alpha = self.y_mean - beta * self.x_mean
+
+        insufficient = self.count < 2
+        alpha[insufficient] = np.nan
+        beta[insufficient] = np.nan
+        return alpha, beta
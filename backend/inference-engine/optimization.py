@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+
+import numpy as np
+
+from models import EfficientFrontier, PortfolioConstraints, PortfolioSolution
+
+
+def _solve_min_variance(
+    cov: np.ndarray,
+    expected_returns: np.ndarray,
+    target_return: float,
+    initial_guess: np.ndarray,
+) -> tuple[bool, np.ndarray]:
+    from scipy.optimize import minimize
+
+    # Minimizing variance has the same argmin as minimizing volatility but a smooth,
+    # analytic gradient; scaling by the mean variance keeps SLSQP's tolerances meaningful.
+    scale = float(np.mean(np.diag(cov))) or 1.0
+    scaled_cov = cov / scale
+    ones = np.ones(len(expected_returns))
+
+    constraints = (
+        {"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: ones},
+        {"type": "eq", "fun": lambda w: expected_returns @ w - target_return, "jac": lambda w: expected_returns},
+    )
+
+    result = minimize(
+        lambda w: w @ scaled_cov @ w,
+        initial_guess,
+        jac=lambda w: 2.0 * (scaled_cov @ w),
+        method="SLSQP",
+        bounds=[(0.0, 1.0)] * len(expected_returns),
+        constraints=constraints,
+        options={"maxiter": 1000, "ftol": 1e-12},
+    )
+    return bool(result.success), result.x
+
+
+def _solve_frontier_chunk(
+    cov: np.ndarray,
+    expected_returns: np.ndarray,
+    target_returns: np.ndarray,
+    initial_guess: np.ndarray,
+    warm_start: bool,
+) -> list[tuple[bool, np.ndarray]]:
+    guess = initial_guess
+    solutions = []
+    for target in target_returns:
+        success, weights = _solve_min_variance(cov, expected_returns, float(target), guess)
+        solutions.append((success, weights))
+        if warm_start and success:
+            guess = weights
+    return solutions
+
+
+def compute_efficient_frontier(
+    cov: np.ndarray,
+    expected_returns: np.ndarray,
+    asset_names: Sequence[str],
+    n_points: int = 100,
+    n_jobs: int = 1,
+    warm_start: bool = True,
+) -> EfficientFrontier:
+    cov = np.ascontiguousarray(cov, dtype=np.float64)
+    expected_returns = np.asarray(expected_returns, dtype=np.float64)
+    n_assets = len(expected_returns)
+    if cov.shape != (n_assets, n_assets):
+        raise ValueError("cov must be a square matrix matching expected_returns")
+    if n_points < 1:
+        raise ValueError("n_points must be positive")
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be positive")
+
+    target_returns = np.linspace(expected_returns.min(), expected_returns.max() - 1e-6, n_points)
+    initial_guess = np.full(n_assets, 1.0 / n_assets)
+
+    # Contiguous chunks keep neighbouring targets together so warm starts stay useful per worker.
+    chunks = [chunk for chunk in np.array_split(target_returns, min(n_jobs, n_points)) if len(chunk)]
+    if len(chunks) <= 1:
+        solutions = _solve_frontier_chunk(cov, expected_returns, target_returns, initial_guess, warm_start)
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [
+                pool.submit(_solve_frontier_chunk, cov, expected_returns, chunk, initial_guess, warm_start)
+                for chunk in chunks
+            ]
+            solutions = [solution for future in futures for solution in future.result()]
+
+    solved = [(target, weights) for target, (success, weights) in zip(target_returns, solutions) if success]
+    weights = np.array([weights for _, weights in solved]).reshape(len(solved), n_assets)
+
+    return EfficientFrontier(
+        asset_names=list(asset_names),
+        target_returns=np.array([target for target, _ in solved]),
+        returns=weights @ expected_returns,
+        volatilities=np.sqrt(np.einsum("ij,jk,ik->i", weights, cov, weights)),
+        weights=weights,
+    )
+
+
+def _project_to_capped_simplex(weights: np.ndarray, max_weight: float) -> np.ndarray:
+    # Euclidean projection onto {0 <= w <= max_weight, sum(w) = 1}: bisect for the shift
+    # that makes the clipped weights sum to one.
+    low, high = -weights.max(), 1.0 - weights.min()
+    for _ in range(60):
+        shift = (low + high) / 2.0
+        if np.clip(weights + shift, 0.0, max_weight).sum() > 1.0:
+            high = shift
+        else:
+            low = shift
+    return np.clip(weights + (low + high) / 2.0, 0.0, max_weight)
+
+
+class _FactoredCovariance:
+    def __init__(self, cov: np.ndarray, expected_returns: np.ndarray) -> None:
+        n_assets = len(expected_returns)
+        self.scale = float(np.mean(np.diag(cov))) or 1.0
+        self.cov = cov / self.scale
+        self.expected_returns = expected_returns
+
+        # One Cholesky factorization gives the bound-free frontier for every scenario. With more
+        # assets than months the covariance is singular, so a tiny ridge keeps it factorable.
+        ones = np.ones(n_assets)
+        try:
+            factor = np.linalg.cholesky(self.cov + 1e-8 * np.eye(n_assets))
+            solved = np.linalg.solve(factor.T, np.linalg.solve(factor, np.column_stack([ones, expected_returns])))
+            self.inv_ones, self.inv_returns = solved[:, 0], solved[:, 1]
+        except np.linalg.LinAlgError:
+            self.inv_ones, self.inv_returns = ones, np.zeros(n_assets)
+        self.a = float(ones @ self.inv_ones)
+        self.b = float(ones @ self.inv_returns)
+        self.c = float(expected_returns @ self.inv_returns)
+        self.d = self.a * self.c - self.b**2
+
+    def warm_start(self, constraints: PortfolioConstraints) -> np.ndarray:
+        target = constraints.target_return
+        if constraints.target_volatility is not None and self.d > 0:
+            # Return of the bound-free frontier portfolio at the target variance (upper branch).
+            variance = constraints.target_volatility**2 / self.scale
+            if self.a * variance > 1.0:
+                target = (self.b + np.sqrt(self.d * (self.a * variance - 1.0))) / self.a
+        if target is None or self.d <= 0:
+            weights = self.inv_ones / self.a if self.a else np.full(len(self.inv_ones), 1.0 / len(self.inv_ones))
+        else:
+            weights = ((self.c - self.b * target) * self.inv_ones + (self.a * target - self.b) * self.inv_returns) / self.d
+        return _project_to_capped_simplex(weights, constraints.max_weight)
+
+
+def _extreme_return(expected_returns: np.ndarray, max_weight: float, highest: bool) -> float:
+    # Filling the best (or worst) assets up to the cap is optimal for a linear objective.
+    ordered = np.sort(expected_returns)[::-1] if highest else np.sort(expected_returns)
+    full = int(1.0 // max_weight)
+    total = max_weight * ordered[:full].sum()
+    if full < len(ordered):
+        total += (1.0 - max_weight * full) * ordered[full]
+    return float(total)
+
+
+def _infeasibility(factored: _FactoredCovariance, constraints: PortfolioConstraints) -> str:
+    n_assets = len(factored.expected_returns)
+    if constraints.max_weight * n_assets < 1.0 - 1e-9:
+        return f"max_weight {constraints.max_weight} cannot sum to 1 over {n_assets} assets"
+    if constraints.target_return is not None:
+        low = _extreme_return(factored.expected_returns, constraints.max_weight, highest=False)
+        high = _extreme_return(factored.expected_returns, constraints.max_weight, highest=True)
+        if not low - 1e-12 <= constraints.target_return <= high + 1e-12:
+            return f"target_return must be between {low:.6g} and {high:.6g} with these weight limits"
+    if constraints.target_volatility is not None and factored.a > 0:
+        # No long-only portfolio has less variance than the bound-free minimum 1 / a.
+        floor = np.sqrt(factored.scale / factored.a)
+        if constraints.target_volatility < floor * (1.0 - 1e-6):
+            return f"target_volatility is below the minimum achievable {floor:.6g}"
+    return ""
+
+
+def _solve_scenario(factored: _FactoredCovariance, constraints: PortfolioConstraints) -> PortfolioSolution:
+    from scipy.optimize import minimize
+
+    expected_returns = factored.expected_returns
+    cov = factored.cov
+    n_assets = len(expected_returns)
+    ones = np.ones(n_assets)
+    infeasible = _infeasibility(factored, constraints)
+    if infeasible:
+        return PortfolioSolution(
+            weights=np.full(n_assets, np.nan),
+            expected_return=float("nan"),
+            volatility=float("nan"),
+            success=False,
+            message=infeasible,
+        )
+
+    constraint_list = [{"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: ones}]
+    if constraints.target_volatility is not None:
+        # Maximize return inside the variance budget; returns are rescaled so SLSQP's tolerances apply.
+        return_scale = float(np.abs(expected_returns).max()) or 1.0
+        variance = constraints.target_volatility**2 / factored.scale
+        constraint_list.append(
+            {"type": "ineq", "fun": lambda w: variance - w @ cov @ w, "jac": lambda w: -2.0 * (cov @ w)}
+        )
+        objective = lambda w: -(expected_returns @ w) / return_scale
+        gradient = lambda w: -expected_returns / return_scale
+    else:
+        if constraints.target_return is not None:
+            target = constraints.target_return
+            constraint_list.append(
+                {"type": "eq", "fun": lambda w: expected_returns @ w - target, "jac": lambda w: expected_returns}
+            )
+        objective = lambda w: w @ cov @ w
+        gradient = lambda w: 2.0 * (cov @ w)
+
+    result = minimize(
+        objective,
+        factored.warm_start(constraints),
+        jac=gradient,
+        method="SLSQP",
+        bounds=[(0.0, constraints.max_weight)] * n_assets,
+        constraints=constraint_list,
+        options={"maxiter": 1000, "ftol": 1e-12},
+    )
+    weights = result.x
+    return PortfolioSolution(
+        weights=weights,
+        expected_return=float(expected_returns @ weights),
+        volatility=float(np.sqrt(max(weights @ cov @ weights, 0.0) * factored.scale)),
+        success=bool(result.success),
+        message="" if result.success else str(result.message),
+    )
+
+
+def optimize_portfolios(
+    cov: np.ndarray,
+    expected_returns: np.ndarray,
+    scenarios: Sequence[PortfolioConstraints],
+) -> list[PortfolioSolution]:
+    cov = np.ascontiguousarray(cov, dtype=np.float64)
+    expected_returns = np.asarray(expected_returns, dtype=np.float64)
+    n_assets = len(expected_returns)
+    if cov.shape != (n_assets, n_assets):
+        raise ValueError("cov must be a square matrix matching expected_returns")
+    for constraints in scenarios:
+        if not 0.0 < constraints.max_weight <= 1.0:
+            raise ValueError("max_weight must be in (0, 1]")
+        if constraints.target_return is not None and constraints.target_volatility is not None:
+            raise ValueError("Set at most one of target_return and target_volatility")
+        if constraints.target_volatility is not None and constraints.target_volatility <= 0:
+            raise ValueError("target_volatility must be positive")
+
+    # Scenarios run serially on the calling compute worker, all reusing one Cholesky factorization.
+    factored = _FactoredCovariance(cov, expected_returns)
+    return [_solve_scenario(factored, constraints) for constraints in scenarios]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+class CorrelationIndex:
+    def __init__(self, names: Sequence[str], unit_returns: np.ndarray, leaf_size: int = 40) -> None:
+        from sklearn.neighbors import BallTree
+
+        self.names = list(names)
+        unit = np.asarray(unit_returns, dtype=np.float64)
+        if unit.ndim != 2 or unit.shape[1] != len(self.names):
+            raise ValueError("unit_returns must have one column per name")
+
+        # Zero-variance or gappy cities have no defined correlation, so they are left out of the index.
+        self.positions = np.flatnonzero(np.isfinite(unit).all(axis=0))
+        self._rows = {int(position): row for row, position in enumerate(self.positions)}
+        # Rows are each city's centered, unit-norm returns: |a - b|^2 = 2 * (1 - correlation).
+        self.vectors = np.ascontiguousarray(unit[:, self.positions].T)
+        self.tree = BallTree(self.vectors, leaf_size=leaf_size) if len(self.positions) else None
+
+    def _query(self, vector: np.ndarray, k: int, exclude: int) -> list[tuple[int, float]]:
+        # One extra neighbour covers the city itself being returned.
+        distances, rows = self.tree.query(vector[None, :], k=min(k + 1, len(self.positions)))
+        pairs = [
+            (int(self.positions[row]), float(distance))
+            for distance, row in zip(distances[0], rows[0])
+            if row != exclude
+        ]
+        return pairs[:k]
+
+    def most_correlated(self, position: int, k: int = 10) -> list[tuple[int, float]]:
+        row = self._rows.get(position)
+        if row is None:
+            return []
+        return [(neighbour, 1.0 - distance**2 / 2.0) for neighbour, distance in self._query(self.vectors[row], k, row)]
+
+    def least_correlated(self, position: int, k: int = 10) -> list[tuple[int, float]]:
+        row = self._rows.get(position)
+        if row is None:
+            return []
+        # The nearest neighbours of the mirrored vector are the most negatively correlated cities.
+        return [(neighbour, distance**2 / 2.0 - 1.0) for neighbour, distance in self._query(-self.vectors[row], k, row)]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+import time
+from typing import Callable, Iterator, Optional
+
+# Called with (phase name, seconds, resident memory delta in bytes).
+PhaseListener = Callable[[str, float, int], None]
+
+_listener: Optional[PhaseListener] = None
+
+
+def set_phase_listener(listener: Optional[PhaseListener]) -> None:
+    global _listener
+    _listener = listener
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # Peak rather than current RSS off Linux, so deltas there only ever grow.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    listener = _listener
+    if listener is None:
+        yield
+        return
+
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        listener(name, time.perf_counter() - started, current_rss_bytes() - rss_before)
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
-from typing import Sequence
+import copy
+from dataclasses import fields
+from typing import Any, Sequence, TYPE_CHECKING
 
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
-import statsmodels.api as sm
-from scipy.optimize import minimize
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.tsa.stattools import adfuller
 
-from models import AssetSelection, RiskAnalysisOutputs
+from city_lookup import CityNameIndex
+from clustering import DEFAULT_N_CLUSTERS, ReturnClusters
+from decomposition import batched_adfuller, batched_seasonal_decompose, decomposition_strengths
+from models import (
+    AssetSelection,
+    EfficientFrontier,
+    PortfolioConstraints,
+    PortfolioSolution,
+    RiskAnalysisOutputs,
+    SeasonalDecomposition,
+)
+from moments import ColumnMoments, RegressionMoments
+from optimization import compute_efficient_frontier, optimize_portfolios
+from peer_index import CorrelationIndex
+from phases import phase
+from risk_index import RiskReturnIndex
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+CAPM_METHODS = ("vectorized", "ols")
+MATRIX_DTYPES = ("float64", "float32")
+MONTH_ABBREVIATIONS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 
 class RiskAnalysis:
@@ -24,7 +39,17 @@ class RiskAnalysis:
         asset_names_or_number: AssetSelection,
         us_avg: pd.Series,
         risk_free_rate: float,
+        capm_method: str = "vectorized",
+        matrix_dtype: str = "float64",
+        block_size: int = 512,
     ) -> None:
+        if capm_method not in CAPM_METHODS:
+            raise ValueError(f"capm_method must be one of {CAPM_METHODS}, got {capm_method!r}")
+        if matrix_dtype not in MATRIX_DTYPES:
+            raise ValueError(f"matrix_dtype must be one of {MATRIX_DTYPES}, got {matrix_dtype!r}")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+
         if isinstance(asset_names_or_number, Sequence) and not isinstance(asset_names_or_number, (str, bytes)):
             self.data = df.loc[:, list(asset_names_or_number)]
         elif isinstance(asset_names_or_number, int):
@@ -33,15 +58,347 @@ class RiskAnalysis:
             raise TypeError("asset_names_or_number must be a sequence of names or an integer")
 
         self.us_avg_data = us_avg
-        self.returns = self.data.pct_change().dropna()
-        self.correlation = self.returns.corr()
-        self.distance = 1 - self.correlation
-        self.us_avg_returns = self.us_avg_data.pct_change().dropna()
-        self.cov_matrix = self.returns.cov()
-        self.alpha_beta = self.get_alpha_and_beta()
+        with phase("risk_analysis.returns"):
+            self.returns = self.data.pct_change().dropna()
+            self.us_avg_returns = self.us_avg_data.pct_change().dropna()
+        self.matrix_dtype = np.dtype(matrix_dtype)
+        self.block_size = block_size
+        self._asset_positions: dict[str, int] | None = None
+        self._name_index: CityNameIndex | None = None
+        self._reset_caches()
+        self.capm_method = capm_method
+        with phase(f"risk_analysis.capm_{capm_method}"):
+            self.alpha_beta = self.get_alpha_and_beta()
         self.risk_free_rate = risk_free_rate
         self.expected_returns = self.get_expected_returns_CAPM()
 
+    def export_arrays(self) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+        # Only what serving reads; the dense city x city matrices are still built on demand.
+        decomposition = self.get_seasonal_decomposition()
+        arrays = {
+            "data": self.data.to_numpy(dtype=np.float64),
+            "returns": self.returns.to_numpy(dtype=np.float64),
+            "us_avg": self.us_avg_data.to_numpy(dtype=np.float64),
+            "centered_returns": self._get_centered_returns(),
+            "unit_returns": self._get_unit_returns(),
+            "alpha": self.alpha_beta["Alpha"].to_numpy(dtype=np.float64),
+            "beta": self.alpha_beta["Beta"].to_numpy(dtype=np.float64),
+            "decomposition_trend": decomposition.trend,
+            "decomposition_seasonal": decomposition.seasonal,
+            "decomposition_resid": decomposition.resid,
+            "decomposition_features": decomposition.features.to_numpy(dtype=np.float64),
+        }
+        if self._regression_moments is not None:
+            for field in fields(RegressionMoments):
+                arrays[f"moments_{field.name}"] = np.asarray(getattr(self._regression_moments, field.name))
+        meta = {
+            "decomposition_period": decomposition.period,
+            "decomposition_model": decomposition.model,
+            "decomposition_features": [str(name) for name in decomposition.features.columns],
+            "columns": [str(label) for label in self.data.columns],
+            "data_index": [str(label) for label in self.data.index],
+            "returns_index": [str(label) for label in self.returns.index],
+            "us_avg_index": [str(label) for label in self.us_avg_data.index],
+            "us_avg_name": None if self.us_avg_data.name is None else str(self.us_avg_data.name),
+            "risk_free_rate": self.risk_free_rate,
+            "capm_method": self.capm_method,
+            "matrix_dtype": self.matrix_dtype.name,
+            "block_size": self.block_size,
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], meta: dict[str, Any]) -> RiskAnalysis:
+        # Wraps already-computed (typically memory-mapped, read-only) arrays without copying them.
+        analysis = cls.__new__(cls)
+        columns = pd.Index(meta["columns"], dtype=object)
+        analysis.data = pd.DataFrame(
+            arrays["data"], index=pd.Index(meta["data_index"], dtype=object), columns=columns, copy=False
+        )
+        analysis.returns = pd.DataFrame(
+            arrays["returns"], index=pd.Index(meta["returns_index"], dtype=object), columns=columns, copy=False
+        )
+        analysis.us_avg_data = pd.Series(
+            arrays["us_avg"], index=pd.Index(meta["us_avg_index"], dtype=object), name=meta["us_avg_name"], copy=False
+        )
+        analysis.us_avg_returns = analysis.us_avg_data.pct_change().dropna()
+        analysis.matrix_dtype = np.dtype(meta["matrix_dtype"])
+        analysis.block_size = meta["block_size"]
+        analysis._asset_positions = None
+        analysis._name_index = None
+        analysis._reset_caches()
+        analysis._centered_returns = arrays["centered_returns"]
+        analysis._unit_returns = arrays["unit_returns"]
+        if "moments_count" in arrays:
+            analysis._regression_moments = RegressionMoments(
+                **{field.name: arrays[f"moments_{field.name}"] for field in fields(RegressionMoments)}
+            )
+        analysis.capm_method = meta["capm_method"]
+        analysis.alpha_beta = pd.DataFrame({"Asset": list(columns), "Alpha": arrays["alpha"], "Beta": arrays["beta"]})
+        analysis.risk_free_rate = meta["risk_free_rate"]
+        analysis.expected_returns = analysis.get_expected_returns_CAPM()
+
+        features = pd.DataFrame(arrays["decomposition_features"], index=columns, columns=meta["decomposition_features"])
+        features.index.name = "City"
+        period, model = meta["decomposition_period"], meta["decomposition_model"]
+        analysis._decompositions[(period, model)] = SeasonalDecomposition(
+            dates=list(meta["data_index"]),
+            cities=list(columns),
+            period=period,
+            model=model,
+            trend=arrays["decomposition_trend"],
+            seasonal=arrays["decomposition_seasonal"],
+            resid=arrays["decomposition_resid"],
+            features=features,
+        )
+        return analysis
+
+    def _reset_caches(self) -> None:
+        self._correlation: pd.DataFrame | None = None
+        self._distance: pd.DataFrame | None = None
+        self._cov_matrix: pd.DataFrame | None = None
+        self._centered_returns: np.ndarray | None = None
+        self._unit_returns: np.ndarray | None = None
+        self._asset_volatilities: pd.Series | None = None
+        self._risk_return_index: RiskReturnIndex | None = None
+        self._monthly_sums: np.ndarray | None = None
+        self._monthly_counts: np.ndarray | None = None
+        self._seasonal_table: np.ndarray | None = None
+        self._regression_moments: RegressionMoments | None = None
+        self._decompositions: dict[tuple[int, str], SeasonalDecomposition] = {}
+        self._stationarity: pd.DataFrame | None = None
+        self._return_clusters: ReturnClusters | None = None
+        self._correlation_index: CorrelationIndex | None = None
+
+    @property
+    def correlation(self) -> pd.DataFrame:
+        if self._correlation is None:
+            with phase("risk_analysis.correlation"):
+                if self.matrix_dtype == np.float64:
+                    self._correlation = self.returns.corr()
+                else:
+                    self._correlation = self._labelled_matrix(self._blocked_gram(self._get_unit_returns()))
+        return self._correlation
+
+    @property
+    def distance(self) -> pd.DataFrame:
+        if self._distance is None:
+            self._distance = 1 - self.correlation
+        return self._distance
+
+    @property
+    def cov_matrix(self) -> pd.DataFrame:
+        if self._cov_matrix is None:
+            with phase("risk_analysis.covariance"):
+                if self.matrix_dtype == np.float64:
+                    self._cov_matrix = self.returns.cov()
+                else:
+                    centered = self._get_centered_returns()
+                    scaled = centered / np.sqrt(max(len(centered) - 1, 1))
+                    self._cov_matrix = self._labelled_matrix(
+                        self._blocked_gram(scaled.astype(self.matrix_dtype))
+                    )
+        return self._cov_matrix
+
+    @property
+    def asset_volatilities(self) -> pd.Series:
+        if self._asset_volatilities is None:
+            self._asset_volatilities = self.returns.std()
+        return self._asset_volatilities
+
+    def get_risk_return_index(self) -> RiskReturnIndex:
+        if self._risk_return_index is None:
+            with phase("risk_analysis.risk_index"):
+                self._risk_return_index = RiskReturnIndex(
+                    names=list(self.returns.columns),
+                    volatilities=self.asset_volatilities.to_numpy(),
+                    expected_returns=self.expected_returns.to_numpy(),
+                )
+        return self._risk_return_index
+
+    def get_seasonal_table(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._seasonal_table is None:
+            with phase("risk_analysis.seasonal_table"):
+                self._monthly_sums, self._monthly_counts = self._monthly_totals(self.data)
+                self._seasonal_table = self._round_monthly_means(self._monthly_sums, self._monthly_counts)
+        return self._seasonal_table, self._monthly_counts > 0
+
+    @staticmethod
+    def _monthly_totals(data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        dates = data.index if isinstance(data.index, pd.DatetimeIndex) else pd.to_datetime(data.index)
+        grouped = data.set_axis(dates, axis=0).groupby(dates.month)
+        months = pd.RangeIndex(1, 13)
+        sums = grouped.sum().reindex(months, fill_value=0.0).to_numpy(dtype=np.float64)
+        counts = grouped.count().reindex(months, fill_value=0).to_numpy(dtype=np.int64)
+        return sums, counts
+
+    @staticmethod
+    def _round_monthly_means(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.rint(sums / counts)
+        return np.where(counts > 0, means, 0).astype(np.int32)
+
+    def monthly_price_profiles(self, city_names: Sequence[str]) -> dict[str, list[tuple[str, int]]]:
+        positions = self._positions_of(city_names)
+        table, present = self.get_seasonal_table()
+        return {
+            name: [
+                (MONTH_ABBREVIATIONS[month], int(table[month, position]))
+                for month in range(12)
+                if present[month, position]
+            ]
+            for name, position in zip(city_names, positions)
+        }
+
+    def prepare_serving_indexes(self) -> None:
+        self.get_risk_return_index()
+        self.get_seasonal_table()
+        self.get_name_index()
+        self.get_return_clusters().labels(DEFAULT_N_CLUSTERS)
+        self.get_correlation_index()
+
+    def append_observations(self, new_data: pd.DataFrame, new_us_avg: pd.Series) -> RiskAnalysis:
+        new_data = new_data.loc[~new_data.index.isin(self.data.index)].reindex(columns=self.data.columns)
+        new_us_avg = new_us_avg.loc[~new_us_avg.index.isin(self.us_avg_data.index)]
+        if new_data.empty:
+            return self
+
+        # Build a new instance so the one being served is never mutated mid-request.
+        extended = copy.copy(self)
+        extended._reset_caches()
+        # Trailing gaps are carried forward, the same way the loader fills the end of a series.
+        extended.data = pd.concat([self.data, new_data]).ffill()
+        extended.us_avg_data = pd.concat([self.us_avg_data, new_us_avg])
+        appended = extended.data.iloc[len(self.data) :]
+        new_returns = extended.data.iloc[len(self.data) - 1 :].pct_change().iloc[1:].dropna()
+        extended.returns = pd.concat([self.returns, new_returns])
+        extended.us_avg_returns = extended.us_avg_data.pct_change().dropna()
+
+        if self.capm_method == "vectorized" and self._regression_moments is not None:
+            market = extended.us_avg_returns.reindex(new_returns.index).to_numpy()
+            extended._regression_moments = self._regression_moments.merge(
+                RegressionMoments.from_values(new_returns.to_numpy(), market)
+            )
+            alpha, beta = extended._regression_moments.alpha_beta()
+            extended.alpha_beta = pd.DataFrame({"Asset": list(extended.returns.columns), "Alpha": alpha, "Beta": beta})
+        else:
+            extended.alpha_beta = extended.get_alpha_and_beta()
+        extended.expected_returns = extended.get_expected_returns_CAPM()
+
+        if self._cov_matrix is not None or self._asset_volatilities is not None:
+            with_comoment = self._cov_matrix is not None
+            moments = self._column_moments(with_comoment).merge(
+                ColumnMoments.from_values(new_returns.to_numpy(), with_comoment=with_comoment)
+            )
+            std = moments.std()
+            extended._asset_volatilities = pd.Series(std, index=extended.returns.columns)
+            if with_comoment:
+                cov = moments.covariance()
+                extended._cov_matrix = extended._labelled_matrix(cov.astype(self.matrix_dtype))
+                if self._correlation is not None:
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        correlation = cov / np.outer(std, std)
+                    extended._correlation = extended._labelled_matrix(correlation.astype(self.matrix_dtype))
+
+        if self._monthly_sums is not None and self._monthly_counts is not None:
+            sums, counts = self._monthly_totals(appended)
+            extended._monthly_sums = self._monthly_sums + sums
+            extended._monthly_counts = self._monthly_counts + counts
+            extended._seasonal_table = self._round_monthly_means(extended._monthly_sums, extended._monthly_counts)
+
+        if self._risk_return_index is not None:
+            extended.get_risk_return_index()
+        return extended
+
+    def _column_moments(self, with_comoment: bool) -> ColumnMoments:
+        scale = max(len(self.returns) - 1, 1)
+        return ColumnMoments(
+            count=len(self.returns),
+            mean=self.returns.mean().to_numpy(dtype=np.float64),
+            m2=self.asset_volatilities.to_numpy(dtype=np.float64) ** 2 * scale,
+            comoment=self.cov_matrix.to_numpy(dtype=np.float64) * scale if with_comoment else None,
+        )
+
+    def covariance_rows(self, asset_names: Sequence[str]) -> pd.DataFrame:
+        positions = self._positions_of(asset_names)
+        centered = self._get_centered_returns().astype(self.matrix_dtype, copy=False)
+        values = centered[:, positions].T @ centered / max(len(centered) - 1, 1)
+        return pd.DataFrame(values, index=self.returns.columns[positions], columns=self.returns.columns)
+
+    def split_known_assets(self, asset_names: Sequence[str]) -> tuple[list[str], list[str]]:
+        # Known names come back as canonical labels, once each, so spellings of one city collapse.
+        known: dict[str, None] = {}
+        missing: list[str] = []
+        for name in asset_names:
+            resolved = self.resolve_asset_name(name)
+            if resolved is None:
+                missing.append(name)
+            else:
+                known.setdefault(resolved)
+        return list(known), missing
+
+    def get_name_index(self) -> CityNameIndex:
+        if self._name_index is None:
+            self._name_index = CityNameIndex(self.returns.columns)
+        return self._name_index
+
+    def resolve_asset_name(self, asset_name: str) -> str | None:
+        if asset_name in self._get_asset_positions():
+            return asset_name
+        return self.get_name_index().resolve(asset_name)
+
+    def suggest_asset_names(self, query: str, limit: int = 10) -> list[str]:
+        return self.get_name_index().suggest(query, limit=limit)
+
+    def _get_asset_positions(self) -> dict[str, int]:
+        if self._asset_positions is None:
+            # Keep the first occurrence of duplicated labels, like a label lookup would.
+            self._asset_positions = {}
+            for position, name in enumerate(self.returns.columns):
+                self._asset_positions.setdefault(name, position)
+        return self._asset_positions
+
+    def _positions_of(self, asset_names: Sequence[str]) -> list[int]:
+        asset_positions = self._get_asset_positions()
+        positions = []
+        for name in asset_names:
+            resolved = self.resolve_asset_name(name)
+            if resolved is None:
+                raise ValueError(self._not_found_message(name))
+            positions.append(asset_positions[resolved])
+        return positions
+
+    def _not_found_message(self, asset_name: str) -> str:
+        suggestions = self.suggest_asset_names(asset_name, limit=3)
+        if suggestions:
+            return f"City not found: {asset_name}. Did you mean: {', '.join(suggestions)}?"
+        return f"City not found: {asset_name}"
+
+    def _get_centered_returns(self) -> np.ndarray:
+        if self._centered_returns is None:
+            values = self.returns.to_numpy(dtype=np.float64)
+            self._centered_returns = values - values.mean(axis=0)
+        return self._centered_returns
+
+    def _get_unit_returns(self) -> np.ndarray:
+        if self._unit_returns is None:
+            centered = self._get_centered_returns()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                unit = centered / np.linalg.norm(centered, axis=0)
+            self._unit_returns = unit.astype(self.matrix_dtype, copy=False)
+        return self._unit_returns
+
+    def _blocked_gram(self, factors: np.ndarray) -> np.ndarray:
+        n_assets = factors.shape[1]
+        gram = np.empty((n_assets, n_assets), dtype=self.matrix_dtype)
+        for start in range(0, n_assets, self.block_size):
+            stop = min(start + self.block_size, n_assets)
+            gram[start:stop] = factors[:, start:stop].T @ factors
+        return gram
+
+    def _labelled_matrix(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=self.returns.columns, columns=self.returns.columns, copy=False)
+
     def to_outputs(self) -> RiskAnalysisOutputs:
         return RiskAnalysisOutputs(
             returns=self.returns,
@@ -53,6 +410,9 @@ class RiskAnalysis:
         )
 
     def plot_correlation_matrix(self, figure_size: tuple[int, int] = (15, 15)) -> plt.Figure:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         fig = plt.figure(figsize=figure_size)
         sns.heatmap(
             self.correlation,
@@ -68,55 +428,125 @@ class RiskAnalysis:
         plt.show()
         return fig
 
+    def get_return_clusters(self) -> ReturnClusters:
+        if self._return_clusters is None:
+            with phase("risk_analysis.return_embedding"):
+                self._return_clusters = ReturnClusters(self.returns.columns, self._get_unit_returns())
+        return self._return_clusters
+
+    def get_correlation_index(self) -> CorrelationIndex:
+        if self._correlation_index is None:
+            with phase("risk_analysis.correlation_index"):
+                self._correlation_index = CorrelationIndex(self.returns.columns, self._get_unit_returns())
+        return self._correlation_index
+
+    def correlated_peers(
+        self, asset_name: str, k: int = 10
+    ) -> tuple[str, list[tuple[str, float]], list[tuple[str, float]]]:
+        resolved = self.resolve_asset_name(asset_name)
+        if resolved is None:
+            raise ValueError(self._not_found_message(asset_name))
+
+        index = self.get_correlation_index()
+        position = self._get_asset_positions()[resolved]
+
+        def named(pairs: list[tuple[int, float]]) -> list[tuple[str, float]]:
+            return [(index.names[neighbour], correlation) for neighbour, correlation in pairs]
+
+        return resolved, named(index.most_correlated(position, k)), named(index.least_correlated(position, k))
+
+    def compute_return_clusters(self, n_clusters: int = DEFAULT_N_CLUSTERS) -> tuple[pd.DataFrame, np.ndarray]:
+        clusters = self.get_return_clusters()
+        reduced_data = np.zeros((len(clusters.names), 2))
+        reduced_data[:, : min(2, clusters.embedding.shape[1])] = clusters.embedding[:, :2]
+
+        df_clusters = pd.DataFrame(reduced_data, columns=["PC1", "PC2"], index=self.returns.columns)
+        df_clusters.index.name = "City"
+        df_clusters["Cluster"] = clusters.labels(n_clusters)
+        return df_clusters, clusters.explained_variance_ratio[:2]
+
+    def same_cluster_peers(
+        self, asset_name: str, n_clusters: int = DEFAULT_N_CLUSTERS, limit: int = 10
+    ) -> tuple[str, int, int, list[tuple[str, float]]]:
+        resolved = self.resolve_asset_name(asset_name)
+        if resolved is None:
+            raise ValueError(self._not_found_message(asset_name))
+
+        clusters = self.get_return_clusters()
+        cluster, peers = clusters.peers(self._get_asset_positions()[resolved], n_clusters, limit=limit)
+        size = int(np.count_nonzero(clusters.labels(n_clusters) == cluster))
+        return resolved, cluster, size, [(clusters.names[position], correlation) for position, correlation in peers]
+
     def cluster_returns(self, n_clusters: int = 5) -> plt.Figure:
-        kmeans = KMeans(n_clusters=n_clusters, random_state=0, n_init=10)
-        clusters = kmeans.fit_predict(self.distance)
-        pca = PCA(n_components=2)
-        reduced_data = pca.fit_transform(self.correlation)
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-        df_plot = pd.DataFrame(reduced_data, columns=["PC1", "PC2"])
-        df_plot["City"] = self.correlation.columns
-        df_plot["Cluster"] = clusters
+        df_clusters, explained_variance_ratio = self.compute_return_clusters(n_clusters=n_clusters)
+        df_plot = df_clusters.reset_index()
 
         fig = plt.figure(figsize=(12, 8))
         sns.scatterplot(x="PC1", y="PC2", hue="Cluster", data=df_plot, palette="tab10", s=100)
 
         for i, city in enumerate(df_plot["City"]):
-            plt.text(df_plot.iloc[i, 0] + 0.02, df_plot.iloc[i, 1], city, fontsize=9)
+            plt.text(df_plot.loc[i, "PC1"] + 0.02, df_plot.loc[i, "PC2"], city, fontsize=9)
 
         plt.title("PCA of Housing Market Correlations", fontsize=15)
-        plt.xlabel(f"PC1 (Explains {pca.explained_variance_ratio_[0]:.1%} of variance)")
-        plt.ylabel(f"PC2 (Explains {pca.explained_variance_ratio_[1]:.1%} of variance)")
+        plt.xlabel(f"PC1 (Explains {explained_variance_ratio[0]:.1%} of variance)")
+        plt.ylabel(f"PC2 (Explains {explained_variance_ratio[1]:.1%} of variance)")
         plt.axvline(0, color="grey", linestyle="--", alpha=0.5)
         plt.axhline(0, color="grey", linestyle="--", alpha=0.5)
         sns.despine()
         plt.show()
         return fig
 
-    def plot_season_variance(self) -> plt.Figure:
-        features = []
-
-        for city in self.data.columns:
-            decomp = seasonal_decompose(self.data[city].dropna(), model="additive", period=12)
-            trend = decomp.trend.dropna()
-            seasonal = decomp.seasonal.dropna()
-            mean_price = self.data[city].mean()
-
-            trend_strength = trend.std() / mean_price
-            season_strength = seasonal.std() / mean_price
-
-            features.append(
-                {
-                    "City": city,
-                    "Trend_Strength": trend_strength,
-                    "Seasonal_Strength": season_strength,
-                }
-            )
+    def get_seasonal_decomposition(self, period: int = 12, model: str = "additive") -> SeasonalDecomposition:
+        key = (period, model)
+        if key not in self._decompositions:
+            with phase("risk_analysis.seasonal_decomposition"):
+                values = self.data.to_numpy(dtype=np.float64)
+                trend, seasonal, resid = batched_seasonal_decompose(values, period=period, model=model)
+                features = pd.DataFrame(
+                    decomposition_strengths(values, trend, seasonal, resid), index=self.data.columns
+                )
+                features.index.name = "City"
+                self._decompositions[key] = SeasonalDecomposition(
+                    dates=[str(date) for date in self.data.index],
+                    cities=list(self.data.columns),
+                    period=period,
+                    model=model,
+                    trend=trend,
+                    seasonal=seasonal,
+                    resid=resid,
+                    features=features,
+                )
+        return self._decompositions[key]
+
+    def get_stationarity_tests(self) -> pd.DataFrame:
+        if self._stationarity is None:
+            with phase("risk_analysis.adf"):
+                stats, pvalues, lags = batched_adfuller(self.data.to_numpy(dtype=np.float64))
+                self._stationarity = pd.DataFrame(
+                    {"ADF_Stat": stats, "ADF_PValue": pvalues, "ADF_Lags": lags}, index=self.data.columns
+                )
+                self._stationarity.index.name = "City"
+        return self._stationarity
 
-        df_features = pd.DataFrame(features).set_index("City")
+    def compute_season_variance_features(self, n_clusters: int = 5) -> pd.DataFrame:
+        from sklearn.cluster import KMeans
 
-        kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
+        df_features = self.get_seasonal_decomposition().features[["Trend_Strength", "Seasonal_Strength"]].copy()
+        # Series shorter than two full cycles have no decomposition and are left out, as before.
+        df_features = df_features.dropna()
+
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         df_features["Cluster"] = kmeans.fit_predict(df_features[["Trend_Strength", "Seasonal_Strength"]])
+        return df_features
+
+    def plot_season_variance(self) -> plt.Figure:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        df_features = self.compute_season_variance_features()
 
         fig = plt.figure(figsize=(10, 8))
         sns.scatterplot(
@@ -148,6 +578,32 @@ class RiskAnalysis:
         plt.show()
         return fig
 
+    def compute_time_series_decomposition(
+        self,
+        city_name: str,
+        model: str = "additive",
+        period: int = 12,
+    ) -> tuple[pd.DataFrame, tuple[float, float]]:
+        resolved = self.resolve_asset_name(city_name)
+        if resolved is None:
+            raise ValueError(self._not_found_message(city_name))
+
+        position = self._get_asset_positions()[resolved]
+        decomposition = self.get_seasonal_decomposition(period=period, model=model)
+        index = self.data.index if isinstance(self.data.index, pd.DatetimeIndex) else pd.to_datetime(self.data.index)
+        components = pd.DataFrame(
+            {
+                "Observed": self.data.iloc[:, position].to_numpy(),
+                "Trend": decomposition.trend[:, position],
+                "Seasonal": decomposition.seasonal[:, position],
+                "Residual": decomposition.resid[:, position],
+            },
+            index=index,
+        )
+
+        adf = self.get_stationarity_tests().iloc[position]
+        return components, (float(adf["ADF_Stat"]), float(adf["ADF_PValue"]))
+
     def plot_time_series_decompose(
         self,
         city_name: str,
@@ -155,23 +611,19 @@ class RiskAnalysis:
         period: int = 12,
         bar_scaling_factor: int = 10,
     ) -> tuple[plt.Figure, tuple[float, float]]:
-        data = self.data[city_name]
-        if not isinstance(data.index, pd.DatetimeIndex):
-            data.index = pd.to_datetime(data.index)
+        import matplotlib.dates as mdates
+        import matplotlib.pyplot as plt
 
-        result = seasonal_decompose(data, model=model, period=period)
+        components, adf = self.compute_time_series_decomposition(city_name, model=model, period=period)
         fig, axs = plt.subplots(4, 1, figsize=(12, 8), sharex=True)
 
-        components = ["Observed", "Trend", "Seasonal", "Residual"]
-        plot_data = [result.observed, result.trend, result.seasonal, result.resid]
-
-        global_range = np.nanmax(result.observed) - np.nanmin(result.observed)
+        global_range = np.nanmax(components["Observed"]) - np.nanmin(components["Observed"])
         bar_height = global_range / bar_scaling_factor
 
         year_locator = mdates.YearLocator()
         year_formatter = mdates.DateFormatter("%Y")
 
-        for ax, comp, series in zip(axs, components, plot_data):
+        for ax, (comp, series) in zip(axs, components.items()):
             ax.plot(series.index, series.values, marker="o", markersize=1, linewidth=1)
             ax.set_title(comp, fontsize=12, fontweight="bold")
             ax.grid(True, alpha=0.3)
@@ -200,30 +652,31 @@ class RiskAnalysis:
         plt.show()
 
         print("--- Stationarity Test (ADF) ---")
-        result_adf = adfuller(data.dropna())
-        print(f"ADF Statistic: {result_adf[0]:.4f}")
-        print(f"p-value: {result_adf[1]:.4f}")
-        if result_adf[1] < 0.05:
+        print(f"ADF Statistic: {adf[0]:.4f}")
+        print(f"p-value: {adf[1]:.4f}")
+        if adf[1] < 0.05:
             print("Result: Likely Stationary")
         else:
             print("Result: Likely Non-Stationary")
 
-        return fig, (result_adf[0], result_adf[1])
+        return fig, adf
 
     def get_mean_monthly_prices(self, city_name: str) -> pd.Series:
-        if city_name not in self.data.columns:
-            raise ValueError(f"City not found: {city_name}")
+        profile = self.monthly_price_profiles([city_name])[city_name]
+        return pd.Series([value for _, value in profile], index=[month for month, _ in profile], dtype=int)
 
-        series = self.data[city_name].dropna()
-        if not isinstance(series.index, pd.DatetimeIndex):
-            series.index = pd.to_datetime(series.index)
+    def get_alpha_and_beta(self) -> pd.DataFrame:
+        if self.capm_method == "ols":
+            return self._get_alpha_and_beta_ols()
 
-        monthly_means = series.groupby(series.index.month).mean().round(0).astype(int)
-        month_names = pd.to_datetime(monthly_means.index, format="%m").strftime("%b")
-        monthly_means.index = month_names
-        return monthly_means
+        market_returns = self.us_avg_returns.reindex(self.returns.index)
+        self._regression_moments = RegressionMoments.from_values(self.returns.to_numpy(), market_returns.to_numpy())
+        alpha, beta = self._regression_moments.alpha_beta()
+        return pd.DataFrame({"Asset": list(self.returns.columns), "Alpha": alpha, "Beta": beta})
+
+    def _get_alpha_and_beta_ols(self) -> pd.DataFrame:
+        import statsmodels.api as sm
 
-    def get_alpha_and_beta(self) -> pd.DataFrame:
         results = {"Asset": [], "Alpha": [], "Beta": []}
         market_returns = self.us_avg_returns.rename("market")
 
@@ -250,6 +703,8 @@ class RiskAnalysis:
         return results_CAPM
 
     def plot_alpha_beta(self) -> plt.Figure:
+        import matplotlib.pyplot as plt
+
         fig = plt.figure(figsize=(10, 6))
         for x in self.alpha_beta.index:
             asset_alpha = self.alpha_beta.loc[x, "Alpha"]
@@ -273,59 +728,54 @@ class RiskAnalysis:
     def get_expected_returns_CAPM(self) -> pd.Series:
         expected_market_return = self.us_avg_returns.mean()
 
-        expected_returns = pd.Series(
-            {
-                asset: self.risk_free_rate
-                + self.alpha_beta.loc[asset, "Beta"]
-                * (expected_market_return - self.risk_free_rate)
-                + self.alpha_beta.loc[asset, "Alpha"]
-                for asset in self.alpha_beta.index
-            }
+        expected_returns = (
+            self.risk_free_rate
+            + self.alpha_beta["Beta"] * (expected_market_return - self.risk_free_rate)
+            + self.alpha_beta["Alpha"]
         )
-        return expected_returns
-
-    def plot_efficient_frontier(self, n_points: int = 100) -> plt.Figure:
-        if pd.api.types.is_integer_dtype(self.expected_returns.index):
-            self.expected_returns.index = self.data.columns
-
-        def get_portfolio_variance(weights: np.ndarray) -> float:
-            return np.dot(weights.T, np.dot(self.cov_matrix, weights))
-
-        def get_portfolio_return(weights: np.ndarray) -> float:
-            return np.sum(self.expected_returns * weights)
-
-        def minimize_volatility(weights: np.ndarray) -> float:
-            return np.sqrt(get_portfolio_variance(weights))
-
-        n_assets = len(self.expected_returns)
-        bounds = tuple((0, 1) for _ in range(n_assets))
-        initial_guess = np.array([1 / n_assets] * n_assets)
+        return expected_returns.rename(None)
 
-        min_ret = self.expected_returns.min()
-        max_ret = self.expected_returns.max()
-        target_returns = np.linspace(min_ret, max_ret - 1e-6, n_points)
-
-        efficient_volatilities: list[float] = []
-        efficient_returns: list[float] = []
-
-        for target in target_returns:
-            constraints = (
-                {"type": "eq", "fun": lambda w: np.sum(w) - 1},
-                {"type": "eq", "fun": lambda w: get_portfolio_return(w) - target},
+    def compute_efficient_frontier(
+        self,
+        n_points: int = 100,
+        n_jobs: int = 1,
+        warm_start: bool = True,
+    ) -> EfficientFrontier:
+        cov = self.cov_matrix.to_numpy(dtype=np.float64)
+        with phase("risk_analysis.efficient_frontier"):
+            return compute_efficient_frontier(
+                cov=cov,
+                expected_returns=self.expected_returns.to_numpy(dtype=np.float64),
+                asset_names=list(self.returns.columns),
+                n_points=n_points,
+                n_jobs=n_jobs,
+                warm_start=warm_start,
             )
 
-            result = minimize(
-                minimize_volatility,
-                initial_guess,
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-                options={"maxiter": 1000},
-            )
+    def optimize_portfolios(
+        self,
+        asset_names: Sequence[str],
+        scenarios: Sequence[PortfolioConstraints],
+    ) -> tuple[list[str], list[PortfolioSolution]]:
+        positions = list(dict.fromkeys(self._positions_of(asset_names)))
+        names = [self.returns.columns[position] for position in positions]
+        # Only the requested rows are computed, so the full city x city covariance is never built.
+        cov = self.covariance_rows(names).to_numpy(dtype=np.float64)[:, positions]
+        expected_returns = self.expected_returns.to_numpy(dtype=np.float64)[positions]
+        with phase("risk_analysis.portfolio_optimization"):
+            solutions = optimize_portfolios(cov, expected_returns, scenarios)
+        return names, solutions
+
+    def plot_efficient_frontier(self, n_points: int = 100, n_jobs: int = 1) -> plt.Figure:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
 
-            if result.success:
-                efficient_volatilities.append(result.fun)
-                efficient_returns.append(target)
+        if pd.api.types.is_integer_dtype(self.expected_returns.index):
+            self.expected_returns.index = self.data.columns
+
+        frontier = self.compute_efficient_frontier(n_points=n_points, n_jobs=n_jobs)
+        efficient_volatilities = frontier.volatilities
+        efficient_returns = frontier.target_returns
 
         fig = plt.figure(figsize=(12, 8))
 
@@ -340,7 +790,7 @@ class RiskAnalysis:
         else:
             print("Warning: Optimizer failed to find the frontier. Check data for NaNs.")
 
-        asset_vols = np.sqrt(np.diag(self.cov_matrix))
+        asset_vols = self.asset_volatilities.to_numpy()
         sns.scatterplot(x=asset_vols, y=self.expected_returns, s=80, color="#1f77b4", zorder=2)
 
         for name, vol, ret in zip(self.expected_returns.index, asset_vols, self.expected_returns):
@@ -376,57 +826,17 @@ class RiskAnalysis:
         city_name: str,
         top_n: int = 3,
     ) -> list[tuple[str, float, float]]:
-        if pd.api.types.is_integer_dtype(self.expected_returns.index):
-            self.expected_returns.index = self.data.columns
-
-        if city_name not in self.data.columns:
-            raise ValueError(f"City not found: {city_name}")
-
-        asset_vols = pd.Series(np.sqrt(np.diag(self.cov_matrix)), index=self.data.columns)
-        target_risk = asset_vols.loc[city_name]
-        target_return = float(self.expected_returns.loc[city_name])
-
-        eligible = asset_vols[asset_vols <= target_risk].index
-        better = self.expected_returns.loc[eligible]
-        better = better[better > target_return].sort_values(ascending=False)
-
-        risk_min = float(asset_vols.min())
-        risk_max = float(asset_vols.max())
-        risk_denom = risk_max - risk_min
-
-        return_min = float(self.expected_returns.min())
-        return_max = float(self.expected_returns.max())
-        return_denom = return_max - return_min
-
-        results: list[tuple[str, float, float]] = []
-
-        if risk_denom == 0:
-            target_scaled_risk = 0.0
-        else:
-            target_scaled_risk = (target_risk - risk_min) / risk_denom * 100.0
+        position = self._positions_of([city_name])[0]
+        return self.get_risk_return_index().better_return_at_risk(position, top_n=top_n)
 
-        if return_denom == 0:
-            target_scaled_return = 0.0
-        else:
-            target_scaled_return = (target_return - return_min) / return_denom * 100.0
-
-        results.append((city_name, round(target_scaled_risk, 2), round(target_scaled_return, 2)))
-        for name in better.index[:top_n]:
-            raw_risk = float(asset_vols.loc[name])
-            if risk_denom == 0:
-                scaled_risk = 0.0
-            else:
-                scaled_risk = (raw_risk - risk_min) / risk_denom * 100.0
-
-            raw_return = float(self.expected_returns.loc[name])
-            if return_denom == 0:
-                scaled_return = 0.0
-            else:
-                scaled_return = (raw_return - return_min) / return_denom * 100.0
-
-            results.append((name, round(scaled_risk, 2), round(scaled_return, 2)))
-
-        return results
+    def top_cities_with_better_return_at_risk_batch(
+        self,
+        city_names: Sequence[str],
+        top_n: int = 3,
+    ) -> dict[str, list[tuple[str, float, float]]]:
+        positions = self._positions_of(city_names)
+        results = self.get_risk_return_index().better_return_at_risk_many(positions, top_n=top_n)
+        return dict(zip(city_names, results))
 
 
 risk_analysis = RiskAnalysis
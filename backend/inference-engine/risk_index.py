@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from bisect import insort
+from typing import Sequence
+
+import numpy as np
+
+
+class RiskReturnIndex:
+    def __init__(
+        self,
+        names: Sequence[str],
+        volatilities: np.ndarray,
+        expected_returns: np.ndarray,
+        prefix_depth: int = 32,
+    ) -> None:
+        self.names = list(names)
+        self.volatilities = np.asarray(volatilities, dtype=np.float64)
+        self.expected_returns = np.asarray(expected_returns, dtype=np.float64)
+        if not (len(self.names) == len(self.volatilities) == len(self.expected_returns)):
+            raise ValueError("names, volatilities and expected_returns must have the same length")
+
+        self.prefix_depth = prefix_depth
+        self.risk_scores = _scale_to_scores(self.volatilities)
+        self.return_scores = _scale_to_scores(self.expected_returns)
+
+        self.order = np.argsort(self.volatilities, kind="stable")
+        self.sorted_volatilities = self.volatilities[self.order]
+        self.prefix_best = self._build_prefix_best()
+
+    def _build_prefix_best(self) -> np.ndarray:
+        # Row p holds the positions of the prefix_depth highest returns among the
+        # p + 1 least volatile assets, best first (-1 padded).
+        table = np.full((len(self.order), self.prefix_depth), -1, dtype=np.int32)
+        best: list[tuple[float, int]] = []
+
+        for row, position in enumerate(self.order):
+            value = self.expected_returns[position]
+            if not np.isnan(value):
+                entry = (-float(value), int(position))
+                if len(best) < self.prefix_depth or entry < best[-1]:
+                    insort(best, entry)
+                    del best[self.prefix_depth :]
+            table[row, : len(best)] = [position for _, position in best]
+
+        return table
+
+    def entry(self, position: int) -> tuple[str, float, float]:
+        return (
+            self.names[position],
+            float(self.risk_scores[position]),
+            float(self.return_scores[position]),
+        )
+
+    def better_return_at_risk(self, position: int, top_n: int = 3) -> list[tuple[str, float, float]]:
+        return self.better_return_at_risk_many([position], top_n=top_n)[0]
+
+    def better_return_at_risk_many(
+        self,
+        positions: Sequence[int],
+        top_n: int = 3,
+    ) -> list[list[tuple[str, float, float]]]:
+        positions = np.asarray(positions, dtype=np.intp)
+        target_vols = self.volatilities[positions]
+        prefix_lengths = np.searchsorted(self.sorted_volatilities, target_vols, side="right")
+
+        results = []
+        for position, target_vol, prefix_length in zip(positions, target_vols, prefix_lengths):
+            results.append(
+                [self.entry(position)]
+                + [self.entry(match) for match in self._better_in_prefix(position, target_vol, prefix_length, top_n)]
+            )
+        return results
+
+    def _better_in_prefix(self, position: int, target_vol: float, prefix_length: int, top_n: int) -> list[int]:
+        target_return = self.expected_returns[position]
+        if top_n <= 0 or prefix_length == 0 or np.isnan(target_vol) or np.isnan(target_return):
+            return []
+
+        if top_n > self.prefix_depth:
+            eligible = self.order[:prefix_length]
+            eligible_returns = self.expected_returns[eligible]
+            better = eligible[eligible_returns > target_return]
+            ranked = better[np.lexsort((better, -self.expected_returns[better]))]
+            return [int(match) for match in ranked[:top_n]]
+
+        matches = []
+        for match in self.prefix_best[prefix_length - 1]:
+            if match < 0 or self.expected_returns[match] <= target_return:
+                break
+            matches.append(int(match))
+            if len(matches) == top_n:
+                break
+        return matches
+
+
+def _scale_to_scores(values: np.ndarray) -> np.ndarray:
+    value_min = np.nanmin(values) if np.isfinite(values).any() else np.nan
+    value_max = np.nanmax(values) if np.isfinite(values).any() else np.nan
+    denom = value_max - value_min
+
+    if not denom:
+        return np.zeros_like(values)
+    return np.round((values - value_min) / denom * 100.0, 2)
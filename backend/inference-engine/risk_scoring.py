@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Mapping, Optional, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from models import RegionRiskScore
+
+if TYPE_CHECKING:
+    from market_arbitrage import MarketArbitrage
+    from risk_analysis import RiskAnalysis
+
+FEATURE_COLUMNS = ("Volatility", "Beta", "Seasonal_Strength", "Mispricing_Z")
+DEFAULT_FEATURE_WEIGHTS: Mapping[str, float] = {
+    "Volatility": 0.35,
+    "Beta": 0.25,
+    "Seasonal_Strength": 0.15,
+    "Mispricing_Z": 0.25,
+}
+
+
+def build_region_features(
+    rent_analysis: "RiskAnalysis",
+    arbitrage: Optional["MarketArbitrage"] = None,
+) -> pd.DataFrame:
+    regions = rent_analysis.returns.columns
+    features = pd.DataFrame(index=regions)
+    features["Volatility"] = rent_analysis.asset_volatilities.to_numpy()
+    features["Beta"] = rent_analysis.alpha_beta["Beta"].to_numpy()
+
+    # Decomposition rows follow the data columns, so they line up with the regions position by position.
+    features["Seasonal_Strength"] = rent_analysis.get_seasonal_decomposition().features["Seasonal_Strength"].to_numpy()
+
+    if arbitrage is not None:
+        z_scores = arbitrage.compute_cross_sectional_valuation()["Z_Score"]
+        features["Mispricing_Z"] = z_scores.reindex(regions).to_numpy()
+    else:
+        features["Mispricing_Z"] = np.nan
+
+    return features[~features.index.duplicated(keep="first")]
+
+
+class RiskScoreTable:
+    def __init__(self, features: pd.DataFrame, weights: Mapping[str, float] = DEFAULT_FEATURE_WEIGHTS) -> None:
+        missing = [column for column in FEATURE_COLUMNS if column not in features.columns]
+        if missing:
+            raise ValueError(f"features are missing columns: {missing}")
+
+        raw = features.loc[:, list(FEATURE_COLUMNS)].astype(float)
+        # Percentile ranks put every feature on the same 0-100 "riskier than x% of regions" scale.
+        ranks = raw.rank(pct=False)
+        counts = raw.notna().sum()
+        component_scores = ((ranks - 1) / (counts - 1).clip(lower=1) * 100.0).round()
+
+        weight_vector = np.array([weights.get(column, 0.0) for column in FEATURE_COLUMNS])
+        available = component_scores.notna().to_numpy()
+        weight_totals = (available * weight_vector).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            composite = np.nansum(component_scores.to_numpy() * weight_vector, axis=1) / weight_totals
+
+        scored = weight_totals > 0
+        self.regions = list(raw.index[scored])
+        self.raw_features = raw.to_numpy()[scored]
+        self.component_scores = component_scores.to_numpy(dtype=np.float32)[scored]
+        self.risk_scores = np.rint(composite[scored]).astype(np.int16)
+        self._positions = {region: position for position, region in enumerate(self.regions)}
+        self._casefolded = {}
+        for position, region in enumerate(self.regions):
+            self._casefolded.setdefault(region.casefold(), position)
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def lookup(self, region: str) -> Optional[RegionRiskScore]:
+        position = self._positions.get(region)
+        if position is None:
+            position = self._casefolded.get(region.strip().casefold())
+        if position is None:
+            return None
+
+        components = [None if np.isnan(score) else int(score) for score in self.component_scores[position]]
+        volatility, beta, seasonal_strength, mispricing_z = (float(value) for value in self.raw_features[position])
+        return RegionRiskScore(
+            region=self.regions[position],
+            risk_score=int(self.risk_scores[position]),
+            volatility_score=components[0],
+            beta_score=components[1],
+            seasonality_score=components[2],
+            valuation_score=components[3],
+            volatility=volatility,
+            beta=beta,
+            seasonal_strength=seasonal_strength,
+            mispricing_z=mispricing_z,
+        )
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+_FORMAT_VERSION = 2
+_META_FILE = "meta.json"
+_CURRENT_FILE = "current"
+
+SharedArrays = Dict[str, np.ndarray]
+
+
+def default_shared_dir() -> Path:
+    # /dev/shm is RAM-backed on Linux, so mapped arrays never touch the disk.
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+    return base / "inference-engine"
+
+
+class SharedArrayStore:
+    def __init__(self, directory: Path | str | None = None) -> None:
+        self.directory = Path(directory) if directory is not None else default_shared_dir()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}-v{_FORMAT_VERSION}"
+
+    def attach(self, key: str) -> Optional[tuple[SharedArrays, Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            meta = json.loads((path / _META_FILE).read_text())
+            # mmap_mode="r" maps the files read-only: every process shares the same physical pages.
+            arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in meta["arrays"]}
+        except (OSError, ValueError, KeyError):
+            return None
+        return arrays, meta["meta"]
+
+    def read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        # The metadata alone, for processes that need the labels but not the arrays.
+        try:
+            return json.loads((self._path(key) / _META_FILE).read_text())["meta"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def publish(self, key: str, arrays: SharedArrays, meta: Dict[str, Any]) -> None:
+        path = self._path(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=self.directory))
+        try:
+            for name, values in arrays.items():
+                with (staging / f"{name}.npy").open("wb") as handle:
+                    np.save(handle, np.asarray(values))
+            (staging / _META_FILE).write_text(json.dumps({"arrays": list(arrays), "meta": meta}))
+            # Readers only ever see a complete directory.
+            os.replace(staging, path)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (path / _META_FILE).exists():
+                raise
+
+    @contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            # Without advisory locks workers may build concurrently; the atomic rename keeps it safe.
+            yield
+            return
+        with open(self.directory / f"{key}.lock", "w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def get_or_publish(
+        self,
+        key: str,
+        build: Callable[[], tuple[SharedArrays, Dict[str, Any]]],
+    ) -> tuple[SharedArrays, Dict[str, Any]]:
+        attached = self.attach(key)
+        if attached is not None:
+            return attached
+
+        # The first process builds and publishes; the others block here, then attach to its files.
+        with self._locked(key):
+            attached = self.attach(key)
+            if attached is None:
+                self.publish(key, *build())
+                attached = self.attach(key)
+        if attached is None:
+            raise OSError(f"Shared arrays for {key} could not be attached")
+        return attached
+
+    def current(self) -> Optional[str]:
+        try:
+            return (self.directory / _CURRENT_FILE).read_text().strip() or None
+        except OSError:
+            return None
+
+    def set_current(self, version: str) -> None:
+        # Every process sharing the directory polls this marker to learn which version to serve.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        handle, staging = tempfile.mkstemp(prefix=f".{_CURRENT_FILE}.", dir=self.directory)
+        try:
+            with os.fdopen(handle, "w") as output:
+                output.write(version)
+            os.replace(staging, self.directory / _CURRENT_FILE)
+        except OSError:
+            Path(staging).unlink(missing_ok=True)
+            raise
+
+    def prune(self, keep: set[str]) -> None:
+        # Mapped files stay valid after unlinking, so workers still on an old version are unaffected.
+        names = {self._path(key).name for key in keep}
+        # Directories from an older format version are removed too.
+        for path in self.directory.glob("*-v[0-9]*"):
+            if path.is_dir() and path.name not in names:
+                shutil.rmtree(path, ignore_errors=True)
+        for path in self.directory.glob("*.lock"):
+            if path.stem not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -35,9 +35,11 @@ def main() -> None:
     results = rent_analysis.top_cities_with_better_return_at_risk("Denver (CO)")
     print("Top 3:", results)
 
-    monthly = rent_analysis.get_mean_monthly_prices("austin (CO)")
+    monthly = rent_analysis.get_mean_monthly_prices("austin (tx)")
     print(monthly)
 
+    print("Suggestions:", rent_analysis.suggest_asset_names("san"))
+
 
 if __name__ == "__main__":
     main()
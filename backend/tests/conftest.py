@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+_INFERENCE_DIR = Path(__file__).resolve().parents[1] / "inference-engine"
+if str(_INFERENCE_DIR) not in sys.path:
+    sys.path.append(str(_INFERENCE_DIR))
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datasets import RegionTimeseries
+from locations import LocationIndex
+
+# 10001 is both a Manhattan ZIP code and the FIPS code of Kent County, DE.
+ZIP_RECORD = ("10001", "zip", "NY", 61639, -1)
+COUNTY_RECORD = ("Kent County (DE)", "county", "DE", 3101, 10001)
+METRO_RECORD = ("Dover, DE", "msa", "DE", 10001, -1)
+OTHER_COUNTY_RECORD = ("Los Angeles County (CA)", "county", "CA", 3101 + 1, 6037)
+
+
+def _source(records: list[tuple[str, str, str, int, int]], seed: int) -> RegionTimeseries:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2018-01-31", periods=36, freq="ME").strftime("%Y-%m-%d")
+    values = 1500.0 * np.cumprod(1.0 + rng.normal(0.003, 0.01, size=(len(dates), len(records))), axis=0)
+    labels = pd.Index([record[0] for record in records], dtype=object)
+    metadata = pd.DataFrame(
+        {
+            "RegionID": [record[3] for record in records],
+            "RegionType": [record[1] for record in records],
+            "State": [record[2] for record in records],
+            "FIPS": np.array([record[4] for record in records], dtype=np.int32),
+        },
+        index=labels,
+    )
+    return RegionTimeseries(values=pd.DataFrame(values, index=pd.Index(dates), columns=labels), metadata=metadata)
+
+
+@pytest.fixture(scope="module")
+def index() -> LocationIndex:
+    regions = _source([ZIP_RECORD, ("10002", "zip", "NY", 61640, -1), METRO_RECORD], seed=0)
+    counties = _source([COUNTY_RECORD, OTHER_COUNTY_RECORD], seed=1)
+    us_avg = regions.values.mean(axis=1)
+    return LocationIndex(sources=[regions, counties], us_avg=us_avg)
+
+
+def label(index: LocationIndex, record_id: int | None) -> str | None:
+    return None if record_id is None else index.labels[record_id]
+
+
+def test_zip_shaped_query_never_matches_a_county_or_region_id(index: LocationIndex) -> None:
+    assert label(index, index.resolve("10001")) == "10001"
+    assert label(index, index.resolve("10001-1234")) == "10001"
+
+
+def test_zip_shaped_query_without_a_zip_row_is_not_found(index: LocationIndex) -> None:
+    assert index.resolve("06037") is None
+    assert index.resolve("19901") is None
+
+
+def test_code_type_selects_the_table(index: LocationIndex) -> None:
+    assert label(index, index.resolve("10001", code_type="zip")) == "10001"
+    assert label(index, index.resolve("10001", code_type="fips")) == "Kent County (DE)"
+    assert label(index, index.resolve("06037", code_type="fips")) == "Los Angeles County (CA)"
+    assert label(index, index.resolve("6037", code_type="fips")) == "Los Angeles County (CA)"
+    assert label(index, index.resolve("10001", code_type="region_id")) == "Dover, DE"
+
+
+def test_levels_imply_the_code_type(index: LocationIndex) -> None:
+    assert label(index, index.resolve("10001", levels=("zip",))) == "10001"
+    assert label(index, index.resolve("10001", levels=("county",))) == "Kent County (DE)"
+    assert label(index, index.resolve("10001", levels=("metro",))) == "Dover, DE"
+
+
+def test_names_still_resolve(index: LocationIndex) -> None:
+    assert label(index, index.resolve("kent county (de)")) == "Kent County (DE)"
+    assert index.resolve("Kent County (DE)", code_type="fips") is None
+
+
+def test_unknown_code_type_is_rejected(index: LocationIndex) -> None:
+    with pytest.raises(ValueError):
+        index.resolve("10001", code_type="msa")
@@ -40,3 +40,45 @@ export async function fetchSeasonalPrices(city) {
 
   return response.json();
 }
+
+export async function fetchFrontierComparablesBatch(cities, topN = 3) {
+  const response = await fetch(`${API_BASE_URL}/frontier-comparables/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ cities, top_n: topN }),
+  });
+
+  if (!response.ok) {
+    const detail = await response.json().catch(() => ({}));
+    throw new Error(detail.detail || "Unable to fetch frontier comparables");
+  }
+
+  return response.json();
+}
+
+export async function fetchSeasonalPricesBatch(cities) {
+  const response = await fetch(`${API_BASE_URL}/seasonal-prices/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ cities }),
+  });
+
+  if (!response.ok) {
+    const detail = await response.json().catch(() => ({}));
+    throw new Error(detail.detail || "Unable to fetch seasonal prices");
+  }
+
+  return response.json();
+}
+
+export async function fetchCitySuggestions(query, limit = 10) {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  const response = await fetch(`${API_BASE_URL}/cities/suggest?${params.toString()}`);
+
+  if (!response.ok) {
+    const detail = await response.json().catch(() => ({}));
+    throw new Error(detail.detail || "Unable to fetch city suggestions");
+  }
+
+  return response.json();
+}